@@ -0,0 +1,170 @@
+"""
+Latency, throughput and memory benchmarks for the MCP tools, run entirely
+offline against benchmarks/fake_alphavantage.py.
+
+    python benchmarks/bench_tools.py                      # print a report
+    python benchmarks/bench_tools.py --json out.json      # also save the results
+    python benchmarks/bench_tools.py --baseline out.json  # fail on regressions
+
+Cold calls use a symbol nothing has seen yet (full download, parse, store and
+compute); warm calls repeat a symbol whose bars and results are cached.
+Throughput runs --concurrency warm calls at a time on the event loop. Peak
+memory is the tracemalloc peak of one cold call.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_alphavantage import FakeAlphaVantage, serve  # noqa: E402
+
+TOOLS = {
+    "sma_tool": lambda symbol: {"symbol": symbol},
+    "rsi_tool": lambda symbol: {"symbol": symbol},
+    "trade_reco_tool": lambda symbol: {"symbol": symbol},
+    "fetch_returns_tool": lambda symbol: {"symbol": symbol, "start": "2015-01-01", "end": "2024-03-01"},
+}
+# Endpoint each tool downloads, for pre-generating the fake's responses
+REQUESTS = {
+    "fetch_returns_tool": ("TIME_SERIES_DAILY_ADJUSTED", "daily"),
+}
+# Latency metrics compared against a baseline; higher is worse
+LATENCY_METRICS = ["cold_p50_ms", "warm_p50_ms", "warm_p95_ms", "peak_kib"]
+
+
+def _configure(url: str, data_dir: str) -> None:
+    # Must run before the server modules are imported: they read these at import time
+    os.environ["ALPHAVANTAGE_BASE_URL"] = url
+    os.environ["ALPHAVANTAGE_API_KEY"] = "benchmark"
+    os.environ["FINANCE101_DATA_DIR"] = data_dir
+    os.environ["ALPHAVANTAGE_REQUESTS_PER_MINUTE"] = "1000000"
+    os.environ["ALPHAVANTAGE_REQUESTS_PER_DAY"] = "1000000"
+
+
+def _percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def _call(mcp, tool: str, symbol: str) -> float:
+    start = time.perf_counter()
+    await mcp.call_tool(tool, TOOLS[tool](symbol))
+    return (time.perf_counter() - start) * 1000
+
+
+async def bench_tool(mcp, fake: FakeAlphaVantage, tool: str, iterations: int, concurrency: int) -> dict:
+    function, interval = REQUESTS.get(tool, ("TIME_SERIES_INTRADAY", "1min"))
+    cold_symbols = [f"{tool.split('_')[0].upper()}C{i}" for i in range(iterations + 1)]
+    for symbol in cold_symbols:
+        # Generate the responses up front so the fake's own work isn't timed
+        fake.payload(function, symbol, interval, "full")
+
+    cold = [await _call(mcp, tool, s) for s in cold_symbols[:-1]]
+
+    tracemalloc.start()
+    await _call(mcp, tool, cold_symbols[-1])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    warm_symbol = cold_symbols[0]
+    warm = [await _call(mcp, tool, warm_symbol) for _ in range(iterations * 10)]
+
+    calls = concurrency * iterations
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await asyncio.gather(*(_call(mcp, tool, cold_symbols[i % len(cold_symbols)]) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "cold_p50_ms": statistics.median(cold),
+        "cold_max_ms": max(cold),
+        "warm_p50_ms": statistics.median(warm),
+        "warm_p95_ms": _percentile(warm, 0.95),
+        "throughput_per_s": calls / elapsed,
+        "peak_kib": peak / 1024,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Metrics that got worse than the baseline by more than tolerance (a fraction)."""
+    regressions = []
+    for tool, metrics in results.items():
+        old = baseline.get("results", baseline).get(tool, {})
+        for metric in LATENCY_METRICS:
+            if metric in old and metrics[metric] > old[metric] * (1 + tolerance):
+                regressions.append(f"{tool} {metric}: {old[metric]:.2f} -> {metrics[metric]:.2f}")
+        if "throughput_per_s" in old and metrics["throughput_per_s"] < old["throughput_per_s"] / (1 + tolerance):
+            regressions.append(
+                f"{tool} throughput_per_s: {old['throughput_per_s']:.1f} -> {metrics['throughput_per_s']:.1f}"
+            )
+    return regressions
+
+
+async def run(args) -> dict:
+    fake = FakeAlphaVantage(args.intraday_bars, args.daily_bars, replay_dir=args.replay, latency=args.latency)
+    server = serve(fake)
+    with tempfile.TemporaryDirectory() as data_dir:
+        _configure(f"http://127.0.0.1:{server.server_port}/query", data_dir)
+        from finance_server import mcp
+        from utils.api import AsyncAlphaVantageAPI
+
+        # Per-request logs would dominate the output and the timings
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+
+        try:
+            results = {}
+            for tool in args.tools:
+                results[tool] = await bench_tool(mcp, fake, tool, args.iterations, args.concurrency)
+        finally:
+            await AsyncAlphaVantageAPI.aclose()
+            server.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MCP tools against a fake Alpha Vantage")
+    parser.add_argument("--tools", nargs="+", default=list(TOOLS), choices=list(TOOLS))
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--intraday-bars", type=int, default=5000)
+    parser.add_argument("--daily-bars", type=int, default=2500)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated network latency in seconds")
+    parser.add_argument("--replay", help="directory of recorded responses for the fake server")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs the baseline")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    from tools.batch import format_table
+    print(format_table(
+        ["Tool", "Cold p50", "Cold max", "Warm p50", "Warm p95", "Calls/s", "Peak KiB"],
+        [[tool, f"{r['cold_p50_ms']:.1f}ms", f"{r['cold_max_ms']:.1f}ms", f"{r['warm_p50_ms']:.2f}ms",
+          f"{r['warm_p95_ms']:.2f}ms", f"{r['throughput_per_s']:.0f}", f"{r['peak_kib']:.0f}"]
+         for tool, r in results.items()],
+    ))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": {k: v for k, v in vars(args).items() if k not in ("json", "baseline")},
+                       "results": results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:\n" + "\n".join(f"- {r}" for r in regressions))
+            sys.exit(1)
+        print("\nNo regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Offline stand-in for the Alpha Vantage query endpoint.
+
+Serves TIME_SERIES_INTRADAY and TIME_SERIES_DAILY_ADJUSTED responses in the
+real API's JSON shape, either replayed from recorded files or generated as a
+deterministic random walk per symbol. Point the server at it with
+
+    python benchmarks/fake_alphavantage.py --port 8765 &
+    ALPHAVANTAGE_BASE_URL=http://127.0.0.1:8765/query ALPHAVANTAGE_API_KEY=demo uv run finance_server.py
+
+Recorded responses are looked up in the --replay directory as
+{FUNCTION}_{SYMBOL}_{interval or "daily"}_{outputsize}.json, e.g.
+TIME_SERIES_INTRADAY_IBM_1min_full.json; anything not recorded is synthesized.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlparse
+
+import numpy as np
+import pandas as pd
+
+COMPACT_BARS = 100
+# Generated response bodies kept per instance
+MAX_PAYLOADS = 256
+INTRADAY_FIELDS = ["1. open", "2. high", "3. low", "4. close", "5. volume"]
+DAILY_FIELDS = [
+    "1. open", "2. high", "3. low", "4. close", "5. adjusted close",
+    "6. volume", "7. dividend amount", "8. split coefficient",
+]
+FREQUENCIES = {"1min": "1min", "5min": "5min", "15min": "15min", "30min": "30min", "60min": "60min"}
+
+
+class FakeAlphaVantage:
+    """
+    Payload source for the fake endpoint.
+
+    Args:
+        intraday_bars: Bars in a full intraday response
+        daily_bars: Bars in a full daily response
+        end: Timestamp of the newest bar
+        replay_dir: Directory of recorded responses, tried before synthesizing
+        latency: Seconds added to every response, to mimic the network
+    """
+
+    def __init__(self, intraday_bars: int = 5000, daily_bars: int = 2500, end: str = "2024-03-01 16:00",
+                 replay_dir: Optional[str] = None, latency: float = 0.0):
+        self.intraday_bars = intraday_bars
+        self.daily_bars = daily_bars
+        self.end = pd.Timestamp(end)
+        self.replay_dir = replay_dir
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._payloads: "OrderedDict[Tuple[str, str, str, str], bytes]" = OrderedDict()
+
+    def respond(self, params: Dict[str, str]) -> Tuple[int, bytes]:
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if not params.get("apikey"):
+            return 200, json.dumps({"Error Message": "the parameter apikey is invalid or missing."}).encode()
+        return 200, self.payload(
+            params.get("function", ""),
+            params.get("symbol", ""),
+            params.get("interval", "daily"),
+            params.get("outputsize", "compact"),
+        )
+
+    def payload(self, function: str, symbol: str, interval: str = "daily", outputsize: str = "compact") -> bytes:
+        """
+        Response body for a request. Bodies are generated once and kept, so
+        callers can build them ahead of a timed run.
+        """
+        key = (function, symbol.upper(), interval, outputsize)
+        with self._lock:
+            body = self._payloads.get(key)
+            if body is not None:
+                self._payloads.move_to_end(key)
+                return body
+        body = self._build(key)
+        with self._lock:
+            self._payloads[key] = body
+            while len(self._payloads) > MAX_PAYLOADS:
+                self._payloads.popitem(last=False)
+        return body
+
+    def _build(self, key: Tuple[str, str, str, str]) -> bytes:
+        recorded = self._recorded(key)
+        if recorded is not None:
+            return recorded
+        function, symbol, interval, outputsize = key
+        if function == "TIME_SERIES_INTRADAY" and interval in FREQUENCIES:
+            body = self.intraday(symbol, interval, outputsize)
+        elif function == "TIME_SERIES_DAILY_ADJUSTED":
+            body = self.daily(symbol, outputsize)
+        else:
+            body = {"Error Message": f"Invalid API call: {function} {interval}"}
+        return json.dumps(body).encode()
+
+    def _recorded(self, key: Tuple[str, str, str, str]) -> Optional[bytes]:
+        if not self.replay_dir:
+            return None
+        path = os.path.join(self.replay_dir, "_".join(key) + ".json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    @staticmethod
+    def _walk(symbol: str, n: int) -> np.ndarray:
+        # Seeded by symbol, so every request for a symbol sees the same history
+        rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+        return 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+
+    @staticmethod
+    def _series(index: pd.DatetimeIndex, close: np.ndarray, fmt: str, daily: bool) -> Dict[str, Dict[str, str]]:
+        series = {}
+        # Newest first, as the API returns them
+        for ts, c in zip(index[::-1], close[::-1]):
+            row = {
+                "1. open": f"{c * 0.9995:.4f}",
+                "2. high": f"{c * 1.001:.4f}",
+                "3. low": f"{c * 0.999:.4f}",
+                "4. close": f"{c:.4f}",
+            }
+            if daily:
+                row.update({"5. adjusted close": f"{c:.4f}", "6. volume": "1000000",
+                            "7. dividend amount": "0.0000", "8. split coefficient": "1.0"})
+            else:
+                row["5. volume"] = "1000"
+            series[ts.strftime(fmt)] = row
+        return series
+
+    def intraday(self, symbol: str, interval: str, outputsize: str) -> Dict[str, Any]:
+        n = self.intraday_bars if outputsize == "full" else min(COMPACT_BARS, self.intraday_bars)
+        index = pd.date_range(end=self.end, periods=self.intraday_bars, freq=FREQUENCIES[interval])[-n:]
+        close = self._walk(f"{symbol}:{interval}", self.intraday_bars)[-n:]
+        return {
+            "Meta Data": {"2. Symbol": symbol, "4. Interval": interval, "5. Output Size": outputsize},
+            f"Time Series ({interval})": self._series(index, close, "%Y-%m-%d %H:%M:%S", daily=False),
+        }
+
+    def daily(self, symbol: str, outputsize: str) -> Dict[str, Any]:
+        n = self.daily_bars if outputsize == "full" else min(COMPACT_BARS, self.daily_bars)
+        index = pd.bdate_range(end=self.end.normalize(), periods=self.daily_bars)[-n:]
+        close = self._walk(f"{symbol}:daily", self.daily_bars)[-n:]
+        return {
+            "Meta Data": {"2. Symbol": symbol, "4. Output Size": outputsize},
+            "Time Series (Daily)": self._series(index, close, "%Y-%m-%d", daily=True),
+        }
+
+
+def make_handler(fake: FakeAlphaVantage):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/query":
+                self.send_error(404)
+                return
+            status, body = fake.respond(dict(parse_qsl(url.query)))
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(fake: FakeAlphaVantage, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the fake endpoint on a background thread; its URL is http://host:server.server_port/query."""
+    server = ThreadingHTTPServer((host, port), make_handler(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--intraday-bars", type=int, default=5000)
+    parser.add_argument("--daily-bars", type=int, default=2500)
+    parser.add_argument("--end", default="2024-03-01 16:00", help="timestamp of the newest bar")
+    parser.add_argument("--replay", help="directory of recorded responses")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+
+    fake = FakeAlphaVantage(args.intraday_bars, args.daily_bars, args.end, args.replay, args.latency)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(fake))
+    print(f"Fake Alpha Vantage listening on http://{args.host}:{server.server_port}/query")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,221 @@
-from datetime import date
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional
 from mcp.server.fastmcp import FastMCP
+from tools.alerts import add_alert, list_alerts, poll_alerts, remove_alert
+from tools.backtest import backtest_batch, backtest_trade_rule
+from tools.crossovers import scan_crossovers
+from tools.export import export_bars
+from tools.batch import calculate_returns_batch, normalize_symbols, trade_recommendation_batch
 from tools.moving_average import calculate_moving_averages
+from tools.portfolio import portfolio_risk
 from tools.returns import calculate_returns
 from tools.rsi import calculate_rsi
+from tools.screener import screen_symbols
+from tools.server_metrics import server_metrics
+from tools.sweep import sweep_sma_periods
+from tools.technicals import calculate_indicators
 from tools.trade_reco import trade_recommendation
+from utils.alerts import alert_engine
+from utils.api import AsyncAlphaVantageAPI
+from utils.data_model import normalize_symbol
+from utils.market_data import aget_bars, aget_daily
+from utils.metrics import metrics
+from utils.refresher import watchlist_refresher
 
-mcp = FastMCP("QuantAssistant", dependencies=["requests", "pandas", "tabulate"])
+def _on_refresh(symbol: str) -> None:
+    # Precompute the default recommendation and evaluate the symbol's alerts on the new bars
+    trade_recommendation(symbol)
+    alert_engine.check([symbol])
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    # Keep the watchlist's bars (and its default recommendation) warm while the server runs
+    watchlist_refresher.on_refresh = _on_refresh
+    watchlist_refresher.start()
+    metrics.start_logging()
+    try:
+        yield
+    finally:
+        await watchlist_refresher.stop()
+        await AsyncAlphaVantageAPI.aclose()
+
+mcp = FastMCP("QuantAssistant", dependencies=["httpx", "numpy", "pandas", "python-dotenv", "requests"], lifespan=lifespan)
+
+def timed_tool():
+    """Register a tool with its end-to-end latency recorded as tool.<name>."""
+    def register(fn):
+        return mcp.tool()(metrics.timed(f"tool.{fn.__name__}")(fn))
+    return register
 
 # Register tools
-@mcp.tool()
-def sma_tool(symbol: str, short_period: int = 20, long_period: int = 50):
-    return calculate_moving_averages(symbol, short_period, long_period)
+# Bars are fetched on the event loop through the pooled async client; the
+# pandas work then runs in a worker thread against the warm cache, so
+# concurrent calls overlap their I/O instead of queueing behind each other.
+# Intervals coarser than 1min are resampled from the 1-minute bars locally.
+@timed_tool()
+async def sma_tool(symbol: str, short_period: int = 20, long_period: int = 50, interval: str = "1min"):
+    await aget_bars(symbol, interval)
+    return await asyncio.to_thread(calculate_moving_averages, symbol, short_period, long_period, interval)
+
+@timed_tool()
+async def sma_sweep_tool(symbol: str, short_periods: Optional[List[int]] = None,
+                         long_periods: Optional[List[int]] = None, allow_short: bool = False, top: int = 10,
+                         interval: str = "1min"):
+    await aget_bars(symbol, interval)
+    return await asyncio.to_thread(sweep_sma_periods, symbol, short_periods, long_periods, allow_short, top, interval)
+
+@timed_tool()
+async def crossover_tool(symbol: str, short_period: int = 20, long_period: int = 50, window: Optional[int] = None,
+                         interval: str = "1min"):
+    await aget_bars(symbol, interval)
+    return await asyncio.to_thread(scan_crossovers, symbol, short_period, long_period, window, interval)
+
+@timed_tool()
+async def rsi_tool(symbol: str, period: int = 14, method: str = "simple", interval: str = "1min"):
+    await aget_bars(symbol, interval)
+    return await asyncio.to_thread(calculate_rsi, symbol, period, method, interval)
+
+@timed_tool()
+async def indicators_tool(symbol: str, indicators: Optional[List[str]] = None, interval: str = "1min"):
+    await aget_bars(symbol, interval)
+    return await asyncio.to_thread(calculate_indicators, symbol, indicators, interval)
+
+@timed_tool()
+async def trade_reco_tool(symbol: str, interval: str = "1min"):
+    await aget_bars(symbol, interval)
+    return await asyncio.to_thread(trade_recommendation, symbol, interval)
+
+@timed_tool()
+async def backtest_tool(symbol: str, short_period: int = 20, long_period: int = 50, rsi_period: int = 14,
+                        allow_short: bool = False, cost_bps: float = 0.0, interval: str = "1min"):
+    await aget_bars(symbol, interval)
+    return await asyncio.to_thread(
+        backtest_trade_rule, symbol, short_period, long_period, rsi_period, allow_short, cost_bps, interval
+    )
+
+@timed_tool()
+async def fetch_returns_tool(symbol: str, start: str = "2020-01-01", end: Optional[str] = None):
+    await aget_daily(symbol)
+    return await asyncio.to_thread(calculate_returns, symbol, start, end)
+
+async def _prefetch(symbols: List[str], fetch: Callable[[str], Awaitable[object]]) -> Dict[str, str]:
+    """Fetch bars for all symbols concurrently (within the rate limit); return per-symbol errors."""
+    results = await asyncio.gather(*(fetch(s) for s in symbols), return_exceptions=True)
+    return {s: str(r) for s, r in zip(symbols, results) if isinstance(r, Exception)}
+
+@timed_tool()
+async def trade_reco_batch_tool(symbols: List[str], interval: str = "1min"):
+    symbols = normalize_symbols(symbols)
+    failed = await _prefetch(symbols, lambda s: aget_bars(s, interval))
+    return await asyncio.to_thread(trade_recommendation_batch, symbols, interval, failed=failed)
+
+@timed_tool()
+async def returns_batch_tool(symbols: List[str], start: str = "2020-01-01", end: Optional[str] = None):
+    symbols = normalize_symbols(symbols)
+    failed = await _prefetch(symbols, aget_daily)
+    return await asyncio.to_thread(calculate_returns_batch, symbols, start, end, failed=failed)
+
+@timed_tool()
+async def backtest_batch_tool(symbols: List[str], short_period: int = 20, long_period: int = 50,
+                              rsi_period: int = 14, allow_short: bool = False, cost_bps: float = 0.0,
+                              interval: str = "1min"):
+    symbols = normalize_symbols(symbols)
+    failed = await _prefetch(symbols, lambda s: aget_bars(s, interval))
+    return await asyncio.to_thread(
+        backtest_batch, symbols, short_period, long_period, rsi_period, allow_short, cost_bps, interval,
+        failed=failed,
+    )
+
+@timed_tool()
+async def screener_tool(symbols: Optional[List[str]] = None, rsi_below: Optional[float] = 30,
+                        rsi_above: Optional[float] = None, trend: Optional[str] = "bullish",
+                        short_period: int = 20, long_period: int = 50, rsi_period: int = 14,
+                        interval: str = "1min"):
+    # Reads only the local cache, so it never spends API quota
+    return await asyncio.to_thread(
+        screen_symbols, symbols, rsi_below, rsi_above, trend, short_period, long_period, rsi_period, interval
+    )
+
+@timed_tool()
+async def portfolio_risk_tool(weights: Dict[str, float], start: str = "2020-01-01", end: Optional[str] = None,
+                              benchmark: Optional[str] = "SPY", window: int = 21, confidence: float = 0.95):
+    symbols = normalize_symbols(list(weights) + ([benchmark] if benchmark else []))
+    failed = await _prefetch(symbols, aget_daily)
+    if failed:
+        raise ValueError("Could not fetch daily data: " + "; ".join(f"{s}: {e}" for s, e in failed.items()))
+    return await asyncio.to_thread(portfolio_risk, weights, start, end, benchmark, window, confidence)
+
+@timed_tool()
+async def watchlist_tool(symbols: Optional[List[str]] = None, refresh_now: bool = False):
+    # Replace the background-refreshed watchlist when symbols is given; report its status
+    if symbols is not None:
+        watchlist_refresher.set_symbols(symbols)
+    if refresh_now:
+        await watchlist_refresher.refresh_once()
+    return watchlist_refresher.status()
+
+@timed_tool()
+async def add_alert_tool(symbol: str, condition: str, interval: str = "1min", once: bool = False,
+                         watch: bool = True):
+    # Alerts are evaluated as bars arrive; watch keeps the symbol on the background-refreshed watchlist
+    symbol = normalize_symbol(symbol)
+    await aget_bars(symbol, interval)
+    if watch and symbol not in watchlist_refresher.symbols:
+        watchlist_refresher.set_symbols(watchlist_refresher.symbols + [symbol])
+    return await asyncio.to_thread(add_alert, symbol, condition, interval, once)
+
+@timed_tool()
+async def list_alerts_tool(symbol: Optional[str] = None):
+    return list_alerts(symbol)
+
+@timed_tool()
+async def remove_alert_tool(alert_id: int):
+    return remove_alert(alert_id)
+
+@timed_tool()
+async def poll_alerts_tool(since: int = 0, check: bool = True):
+    return await asyncio.to_thread(poll_alerts, since, check)
+
+@timed_tool()
+async def market_data_tool(symbol: str, interval: str = "1min", start: Optional[str] = None,
+                           end: Optional[str] = None, columns: Optional[List[str]] = None,
+                           max_points: Optional[int] = None, encoding: str = "columnar"):
+    await (aget_daily(symbol) if interval == "daily" else aget_bars(symbol, interval))
+    return await asyncio.to_thread(export_bars, symbol, interval, start, end, columns, max_points, encoding)
+
+# Raw bars as resources: market-data://IBM/5min, market-data://IBM/1min/2024-03-01T10:00/2024-03-01T12:00
+# and the same with a comma-separated column list appended (e.g. /close,volume); "-" leaves a bound open
+async def _market_data(symbol: str, interval: str, start: str = "-", end: str = "-", columns: str = "") -> str:
+    symbol = normalize_symbol(symbol)
+    await (aget_daily(symbol) if interval == "daily" else aget_bars(symbol, interval))
+    result = await asyncio.to_thread(
+        export_bars, symbol, interval, None if start == "-" else start, None if end == "-" else end,
+        [c for c in columns.split(",") if c] or None,
+    )
+    return json.dumps(result, separators=(",", ":"))
 
-@mcp.tool()
-def rsi_tool(symbol: str, period: int = 14):
-    return calculate_rsi(symbol, period)
+@mcp.resource("market-data://{symbol}/{interval}", mime_type="application/json")
+async def market_data_resource(symbol: str, interval: str) -> str:
+    """OHLCV bars for a symbol and interval (1min, 5min, 15min, 30min, 60min, 1d or daily), columnar JSON."""
+    return await _market_data(symbol, interval)
 
-@mcp.tool()
-def trade_reco_tool(symbol: str):
-    return trade_recommendation(symbol)
+@mcp.resource("market-data://{symbol}/{interval}/{start}/{end}", mime_type="application/json")
+async def market_data_window_resource(symbol: str, interval: str, start: str, end: str) -> str:
+    """OHLCV bars between start and end (ISO timestamps, "-" for open-ended), columnar JSON."""
+    return await _market_data(symbol, interval, start, end)
 
-@mcp.tool()
-def fetch_returns_tool(symbol: str, start: str = "2020-01-01", end: str = str(date.today())):
-    return calculate_returns(symbol, start, end)
+@mcp.resource("market-data://{symbol}/{interval}/{start}/{end}/{columns}", mime_type="application/json")
+async def market_data_columns_resource(symbol: str, interval: str, start: str, end: str, columns: str) -> str:
+    """Selected columns (comma-separated) of the bars between start and end, columnar JSON."""
+    return await _market_data(symbol, interval, start, end, columns)
 
+@timed_tool()
+async def metrics_tool(reset: bool = False):
+    return server_metrics(reset)
 
+@mcp.resource("metrics://server")
+def metrics_resource() -> str:
+    """Server metrics snapshot as JSON."""
+    return json.dumps(metrics.snapshot(), indent=2)
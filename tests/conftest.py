@@ -0,0 +1,46 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The modules read their configuration at import time, so point the bar
+# store at a scratch directory before anything imports them
+os.environ["FINANCE101_DATA_DIR"] = tempfile.mkdtemp(prefix="finance101-tests-")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def make_bars():
+    """Factory for random-walk 1-minute OHLCV bars."""
+    def make(n: int, start: str = "2024-03-01 09:30", seed: int = 0) -> pd.DataFrame:
+        rng = np.random.default_rng(seed)
+        close = 100 + np.cumsum(rng.normal(0, 0.3, n))
+        spread = rng.uniform(0.01, 0.2, n)
+        return pd.DataFrame(
+            {
+                "open": close + rng.normal(0, 0.05, n),
+                "high": close + spread,
+                "low": close - spread,
+                "close": close,
+                "volume": rng.integers(100, 10_000, n),
+            },
+            index=pd.date_range(start, periods=n, freq="min"),
+        )
+    return make
+
+
+@pytest.fixture
+def cache():
+    """The process-wide bar cache, restored to its prior contents afterwards."""
+    from utils.data_model import market_data_cache
+
+    saved = {key: market_data_cache.peek(key) for key in list(market_data_cache)}
+    yield market_data_cache
+    market_data_cache.clear()
+    for key, entry in saved.items():
+        if entry is not None:
+            market_data_cache[key] = entry
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from tools.backtest import signal_strength
+from tools.trade_reco import trade_recommendation
+from utils.data_model import MarketData
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_signal_strength_matches_trade_recommendation(seed, make_bars, cache):
+    # The vectorized backtest score must equal what trade_recommendation
+    # reports at each bar; the series grows so the streaming path is used too
+    symbol = f"SIG{seed}"
+    bars = make_bars(600, seed=seed)
+    scores = signal_strength(bars["close"].to_numpy())
+
+    for end in range(120, 601, 7):
+        window = bars.iloc[:end]
+        cache[f"{symbol}_1min"] = MarketData(symbol, "1min", window, datetime.now())
+
+        result = trade_recommendation(symbol)
+
+        assert result["signal_strength"] == pytest.approx(scores[end - 1]), f"bar {end - 1}"
+
+
+def test_signal_strength_covers_every_component(make_bars):
+    scores = signal_strength(make_bars(5000, seed=3)["close"].to_numpy())
+    # Trend alone, trend plus RSI extremes and crossovers all show up on a long random walk
+    assert {1.0, -1.0, 2.5, -2.5}.issubset(set(np.unique(scores)))
+    assert np.any(np.abs(scores) >= 3)
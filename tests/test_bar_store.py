@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from utils.bar_store import BarStore, merge_bars
+
+
+def daily(n: int, start: str = "2024-01-01") -> pd.DataFrame:
+    close = 100 + np.arange(n, dtype=float)
+    return pd.DataFrame(
+        {
+            "close": close,
+            "adjusted_close": close,
+            "dividend_amount": np.zeros(n),
+            "split_coefficient": np.ones(n),
+        },
+        index=pd.date_range(start, periods=n, freq="D"),
+    )
+
+
+def test_merge_appends_and_takes_revisions_from_delta(make_bars):
+    bars = make_bars(120)
+    history, delta = bars.iloc[:100], bars.iloc[95:].copy()
+    delta.iloc[0, delta.columns.get_loc("close")] += 1.0
+
+    merged = merge_bars(history, delta)
+
+    assert merged.index.equals(bars.index)
+    assert merged["close"].iloc[95] == delta["close"].iloc[0]
+    pd.testing.assert_frame_equal(merged.iloc[:95], bars.iloc[:95])
+
+
+def test_merge_rejects_gap(make_bars):
+    bars = make_bars(120)
+    assert merge_bars(bars.iloc[:100], bars.iloc[105:]) is None
+
+
+def test_merge_rejects_new_column(make_bars):
+    bars = make_bars(120)
+    delta = bars.iloc[95:].assign(vwap=1.0)
+    assert merge_bars(bars.iloc[:100], delta) is None
+
+
+def test_merge_rejects_new_dividend_or_split():
+    bars = daily(30)
+    dividend = bars.iloc[25:].copy()
+    dividend.iloc[-1, dividend.columns.get_loc("dividend_amount")] = 0.5
+    split = bars.iloc[25:].copy()
+    split.iloc[-1, split.columns.get_loc("split_coefficient")] = 2.0
+
+    assert merge_bars(bars.iloc[:28], dividend) is None
+    assert merge_bars(bars.iloc[:28], split) is None
+
+
+def test_merge_accepts_dividend_already_in_history():
+    bars = daily(30)
+    bars.iloc[26, bars.columns.get_loc("dividend_amount")] = 0.5
+
+    merged = merge_bars(bars.iloc[:28], bars.iloc[25:])
+
+    pd.testing.assert_frame_equal(merged, bars)
+
+
+def test_store_round_trip_is_read_only(tmp_path, make_bars):
+    store = BarStore(str(tmp_path))
+    bars = make_bars(50)
+    store.write("ibm", "1min", bars, "full")
+
+    stored = store.read("IBM", "1min")
+
+    pd.testing.assert_frame_equal(stored.data.copy(), bars, check_freq=False)
+    assert stored.outputsize == "full"
+    assert not stored.data["close"].to_numpy().flags.writeable
+    assert store.symbols("1min") == ["IBM"]
@@ -0,0 +1,25 @@
+import math
+
+import tools.batch
+from tools.batch import calculate_returns_batch
+
+
+def test_returns_batch_ranks_undefined_ratios_last(monkeypatch):
+    stats = {
+        "AAA": (0.002, 0.01),
+        "BBB": (math.nan, math.nan),
+        "CCC": (0.001, 0.01),
+        "DDD": (math.nan, 0.02),
+        "EEE": (-0.001, 0.01),
+    }
+
+    def fake_returns(symbol, start, end):
+        mean, std = stats[symbol]
+        return {"symbol": symbol, "mean_return": mean, "std_dev": std, "data_points": 10}
+
+    monkeypatch.setattr(tools.batch, "calculate_returns", fake_returns)
+
+    result = calculate_returns_batch(list(stats))
+
+    assert [r["symbol"] for r in result["ranked"]][:3] == ["AAA", "CCC", "EEE"]
+    assert {r["symbol"] for r in result["ranked"][3:]} == {"BBB", "DDD"}
@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pandas as pd
+
+from utils.api import AlphaVantageAPI
+from utils.fetch_lock import FetchLock
+
+
+def run_threads(n: int, target) -> list:
+    results = [None] * n
+    barrier = threading.Barrier(n)
+
+    def run(i):
+        barrier.wait()
+        results[i] = target()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_fetch_lock_is_exclusive(tmp_path):
+    lock = FetchLock(root=str(tmp_path))
+    holders, peak = [0], [0]
+    guard = threading.Lock()
+
+    def hold():
+        with lock.hold("IBM", "1min") as acquired:
+            with guard:
+                holders[0] += 1
+                peak[0] = max(peak[0], holders[0])
+            time.sleep(0.05)
+            with guard:
+                holders[0] -= 1
+        return acquired
+
+    assert run_threads(4, hold) == [True] * 4
+    assert peak[0] == 1
+
+
+def test_fetch_lock_gives_up_after_timeout(tmp_path):
+    holder = FetchLock(root=str(tmp_path))
+    waiter = FetchLock(root=str(tmp_path), timeout=0.1)
+
+    with holder.hold("IBM", "1min"):
+        with waiter.hold("IBM", "1min") as acquired:
+            assert not acquired
+        with waiter.hold("MSFT", "1min") as acquired:
+            assert acquired
+
+
+def test_read_through_fetches_once_for_concurrent_misses(make_bars):
+    # Separate callers (as separate worker processes would be) miss on the
+    # same series: one downloads it, the others read it from the bar store
+    bars = make_bars(200)
+    calls = []
+
+    def fetch(size: str) -> pd.DataFrame:
+        calls.append(size)
+        time.sleep(0.2)
+        return bars.copy()
+
+    results = run_threads(
+        4, lambda: AlphaVantageAPI._read_through("LOCKED", "1min", "full", fetch, incremental=False)
+    )
+
+    assert calls == ["full"]
+    for df in results:
+        pd.testing.assert_frame_equal(df.copy(), bars, check_freq=False)
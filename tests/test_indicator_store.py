@@ -0,0 +1,30 @@
+from utils.bar_store import merge_bars
+from utils.indicator_store import IndicatorStore, bar_version
+
+
+def revised_compact_update(bars, column="close"):
+    """Merge the last 100 bars back in with an earlier one revised and the last one unchanged."""
+    delta = bars.iloc[-100:].copy()
+    delta.iloc[-30, delta.columns.get_loc(column)] += 1
+    return merge_bars(bars, delta)
+
+
+def test_bar_version_sees_revisions_before_the_last_bar(make_bars):
+    bars = make_bars(300)
+
+    assert bar_version(revised_compact_update(bars)) != bar_version(bars)
+    assert bar_version(revised_compact_update(bars, "volume")) != bar_version(bars)
+    assert bar_version(revised_compact_update(bars, "volume"), ["close"]) == bar_version(bars, ["close"])
+    assert bar_version(bars.copy()) == bar_version(bars)
+
+
+def test_memoized_result_is_recomputed_after_a_revision(make_bars):
+    store = IndicatorStore()
+    bars = make_bars(300)
+    revised = revised_compact_update(bars)
+
+    def total(data):
+        return lambda: float(data["close"].sum())
+
+    assert store.get_or_compute("IBM", "1min", "total", (), bars, total(bars)) == total(bars)()
+    assert store.get_or_compute("IBM", "1min", "total", (), revised, total(revised)) == total(revised)()
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.indicator_engine import IndicatorEngine
+from utils.indicators import (
+    RollingMean, StreamingRSI, compute_indicators, ema, parse_spec, rolling_mean, rsi_array, wilder_rsi,
+)
+
+
+def reference_rsi(close: pd.Series, period: int) -> pd.Series:
+    delta = close.diff()
+    gain = delta.clip(lower=0).rolling(period).mean()
+    loss = (-delta).clip(lower=0).rolling(period).mean()
+    return 100 - 100 / (1 + gain / loss)
+
+
+@pytest.mark.parametrize("period", [1, 5, 20])
+def test_rolling_mean_matches_pandas(period, make_bars):
+    close = make_bars(300)["close"].copy()
+    close.iloc[[40, 41, 200]] = np.nan
+    calc = RollingMean(period)
+
+    streamed = [calc.update(x) for x in close]
+
+    np.testing.assert_allclose(streamed, close.rolling(period).mean(), rtol=1e-12)
+
+
+@pytest.mark.parametrize("period", [2, 14, 30])
+def test_streaming_rsi_matches_pandas(period, make_bars):
+    close = make_bars(300)["close"]
+    calc = StreamingRSI(period)
+
+    streamed = [calc.update(x) for x in close]
+
+    np.testing.assert_allclose(streamed, reference_rsi(close, period), rtol=1e-9)
+
+
+def test_revise_matches_recomputing(make_bars):
+    close = make_bars(100)["close"].to_numpy()
+    sma, rsi = RollingMean(10), StreamingRSI(14)
+    for x in close[:-1]:
+        sma.update(x)
+        rsi.update(x)
+    sma.update(close[-1] - 1)
+    rsi.update(close[-1] - 1)
+
+    assert sma.revise(close[-1]) == pytest.approx(close[-10:].mean())
+    assert rsi.revise(close[-1]) == pytest.approx(reference_rsi(pd.Series(close), 14).iloc[-1])
+
+
+@pytest.mark.parametrize("indicator", ["sma", "rsi"])
+def test_engine_follows_appends_and_revisions(indicator, make_bars):
+    reference = (lambda s: s.rolling(20).mean()) if indicator == "sma" else (lambda s: reference_rsi(s, 20))
+    engine = IndicatorEngine(checkpoint_path="")
+    bars = make_bars(400)["close"]
+
+    versions = [bars.iloc[:200], bars.iloc[:230]]
+    revised_last = bars.iloc[:230].copy()
+    revised_last.iloc[-1] += 0.7
+    # A merged compact update rewrites bars the engine has already consumed
+    revised_earlier = bars.iloc[:262].copy()
+    revised_earlier.iloc[-4] += 1.3
+    revised_earlier.iloc[-22] -= 2.0
+    versions += [revised_last, bars.iloc[:260], revised_earlier, bars]
+
+    for series in versions:
+        state = engine.update("ENG", "1min", indicator, 20, series)
+        expected = reference(series).to_numpy()
+        assert state.value == pytest.approx(expected[-1])
+        np.testing.assert_allclose(list(state.tail), expected[-len(state.tail):])
+
+
+@pytest.mark.parametrize("period", [0, -3])
+def test_kernels_reject_empty_windows(period):
+    x = np.arange(10.0)
+    for kernel in (rolling_mean, rsi_array, ema, wilder_rsi, RollingMean):
+        with pytest.raises(ValueError, match="at least 1"):
+            kernel(x, period) if kernel is not RollingMean else kernel(period)
+
+
+@pytest.mark.parametrize("spec", ["sma:0", "sma(0)", "macd:12,0,9", "bollinger:-5,2", "atr:0"])
+def test_indicator_specs_reject_empty_windows(spec, make_bars):
+    with pytest.raises(ValueError, match="at least 1"):
+        compute_indicators(make_bars(50), [spec])
+
+
+def test_indicator_specs_need_numbers(make_bars):
+    with pytest.raises(ValueError, match="numeric parameters"):
+        compute_indicators(make_bars(50), ["sma:fast"])
+    assert parse_spec("SMA(20)") == parse_spec("sma:20") == ("sma", (20,))
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import utils.api
+from utils.bar_store import bar_store
+from utils.data_model import MarketData
+from utils.market_data import get_bars, get_daily, get_intraday
+from utils.market_hours import MARKET_TZ, settled
+
+
+def test_cold_start_serves_stored_bars_without_network(monkeypatch, make_bars, cache):
+    # Bars an earlier process persisted days ago; any download would fail without a key
+    monkeypatch.setattr(utils.api, "API_KEY", None)
+    bars = make_bars(300)
+    fetched_at = datetime.now() - timedelta(days=3)
+    bar_store.write("COLD", "1min", bars, "full", fetched_at=fetched_at)
+    bar_store.write("COLD", "1d", bars, "full", fetched_at=fetched_at)
+
+    intraday = get_intraday("COLD")
+
+    pd.testing.assert_frame_equal(intraday.copy(), bars, check_freq=False)
+    assert intraday.attrs["fetched_at"] == fetched_at
+    assert get_intraday("COLD") is intraday
+    assert len(get_daily("COLD")) == len(bars)
+
+
+def test_symbol_spellings_share_one_entry(make_bars, cache):
+    bars = make_bars(50)
+    cache["NORM_1min"] = MarketData("NORM", "1min", bars, datetime.now())
+
+    assert get_intraday("norm") is bars
+    assert get_bars(" Norm ", "5min") is get_bars("NORM", "5min")
+
+
+def test_settled_until_the_next_open():
+    friday_close = datetime(2024, 3, 1, 16, 0, tzinfo=MARKET_TZ)
+
+    assert settled(friday_close + timedelta(minutes=5), now=friday_close + timedelta(days=1))
+    assert not settled(friday_close - timedelta(hours=1), now=friday_close + timedelta(hours=2))
+    # Monday's session changes the bars again
+    assert not settled(friday_close + timedelta(minutes=5), now=friday_close + timedelta(days=2, hours=18))
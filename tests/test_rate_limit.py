@@ -0,0 +1,61 @@
+import asyncio
+import os
+
+import pytest
+
+from utils.rate_limit import QuotaExceededError, RequestScheduler, SharedQuota
+
+# The quota is only shared where flock is available
+fcntl = pytest.importorskip("fcntl")
+
+
+def scheduler(path, per_minute=3, max_wait=0.0):
+    return RequestScheduler(per_minute=per_minute, per_day=100, max_wait=max_wait, shared=SharedQuota(str(path)))
+
+
+def test_workers_draw_from_one_quota(tmp_path):
+    path = tmp_path / "quota.json"
+    first, second = scheduler(path), scheduler(path)
+
+    first.acquire()
+    first.acquire()
+    second.acquire()
+
+    with pytest.raises(QuotaExceededError):
+        second.acquire()
+    assert first.remaining()["minute"] < 1
+
+
+def test_quota_file_is_written_only_when_tokens_are_spent(tmp_path):
+    path = tmp_path / "quota.json"
+    sched = scheduler(path)
+
+    sched.remaining()
+    assert not path.exists() or path.read_bytes() == b""
+
+    sched.acquire()
+    written = path.read_bytes()
+    sched.remaining()
+    sched.stats()
+
+    assert path.read_bytes() == written
+
+
+def test_busy_quota_file_does_not_block_the_event_loop(tmp_path):
+    path = tmp_path / "quota.json"
+    sched = scheduler(path, max_wait=5)
+
+    async def main():
+        fd = os.open(path, os.O_RDWR | os.O_CREAT)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            task = asyncio.create_task(sched.acquire_async())
+            # The loop keeps running while another "process" holds the lock
+            await asyncio.sleep(0.1)
+            assert not task.done()
+        finally:
+            os.close(fd)
+        await asyncio.wait_for(task, timeout=1)
+
+    asyncio.run(main())
+    assert sched.granted == 1
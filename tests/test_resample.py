@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.bar_store import merge_bars
+from utils.resample import RESAMPLED_INTERVALS, Resampler, resample_bars
+
+
+@pytest.mark.parametrize("interval", ["5min", "15min", "60min", "1d"])
+def test_resample_matches_pandas(interval, make_bars):
+    minutes = make_bars(3000, start="2024-03-01 09:31")
+    rule = "1D" if interval == "1d" else interval
+
+    bars, _ = resample_bars(minutes, interval)
+
+    expected = minutes.resample(rule, label="left", closed="left").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    ).dropna(subset=["close"])
+    pd.testing.assert_frame_equal(bars.drop(columns="vwap"), expected, check_freq=False)
+
+
+@pytest.mark.parametrize("interval", list(RESAMPLED_INTERVALS))
+def test_incremental_resample_after_merge_matches_full_rebuild(interval, make_bars):
+    bars = make_bars(3000)
+    history = bars.iloc[:2900]
+    # A compact refresh: the last 100 minutes again, the overlap revised, plus new ones
+    delta = bars.iloc[2850:].copy()
+    delta.iloc[:60, delta.columns.get_loc("close")] += 0.25
+    merged = merge_bars(history, delta)
+    resampler = Resampler()
+
+    resampler.resample("RS", interval, history)
+    incremental = resampler.resample("RS", interval, merged)
+
+    full, _ = resample_bars(merged, interval)
+    pd.testing.assert_frame_equal(incremental, full)
+    assert resampler.stats()["incremental"] == 1
+
+
+def test_resampler_reuses_unchanged_result(make_bars):
+    minutes = make_bars(500)
+    resampler = Resampler()
+
+    first = resampler.resample("RS", "5min", minutes)
+
+    assert resampler.resample("RS", "5min", minutes) is first
+    assert resampler.stats()["hits"] == 1
+    np.testing.assert_array_equal(first["volume"].to_numpy(), minutes["volume"].to_numpy().reshape(-1, 5).sum(1))
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+import time
+
+from utils.singleflight import SingleFlight
+
+
+def test_singleflight_coalesces_threads():
+    flights = SingleFlight()
+    calls = []
+    barrier = threading.Barrier(8)
+    results = [None] * 8
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return object()
+
+    def run(i):
+        barrier.wait()
+        results[i] = flights.do("IBM_1min", fetch)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert flights.in_flight() == 0
+
+
+def test_singleflight_coalesces_coroutines():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def main():
+        return await asyncio.gather(*(flights.do_async("IBM_1min", fetch) for _ in range(8)))
+
+    assert asyncio.run(main()) == [1] * 8
+    assert len(calls) == 1
@@ -0,0 +1,24 @@
+import pytest
+
+from tools.sweep import sweep_sma_periods
+
+
+@pytest.mark.parametrize("short, long", [([0, 5], [50]), ([5], [-20, 50]), ([50, 60], [20, 50])])
+def test_sweep_rejects_bad_grids_before_fetching(short, long, monkeypatch):
+    def no_fetch(*args):
+        raise AssertionError("fetched bars for an invalid grid")
+
+    monkeypatch.setattr("tools.sweep.get_bars", no_fetch)
+
+    with pytest.raises(ValueError):
+        sweep_sma_periods("IBM", short, long)
+
+
+def test_sweep_scores_only_short_below_long(make_bars, monkeypatch):
+    bars = make_bars(400)
+    monkeypatch.setattr("tools.sweep.get_bars", lambda symbol, interval: bars)
+
+    result = sweep_sma_periods("SWEEP", [5, 20, 50], [20, 50])
+
+    pairs = {(r["short_period"], r["long_period"]) for r in result["ranked"]}
+    assert pairs == {(5, 20), (5, 50), (20, 50)}
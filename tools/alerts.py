@@ -0,0 +1,93 @@
+from typing import Any, Dict, List, Optional
+from tools.batch import format_table
+from utils.alerts import alert_engine
+
+
+def add_alert(symbol: str, condition: str, interval: str = "1min", once: bool = False) -> Dict[str, Any]:
+    """
+    Register an alert on a symbol and evaluate it against the cached bars
+
+    Args:
+        symbol: The ticker symbol to watch
+        condition: e.g. "RSI(14) < 30", "close > SMA200" or "SMA20 crosses above SMA50"
+        interval: Bar size (1min, or 5min/15min/30min/60min/1d built from 1-minute bars)
+        once: Remove the alert after it first triggers
+
+    Returns:
+        Dictionary with the alert and any events it triggered right away
+    """
+    alert = alert_engine.add(symbol, condition, interval, once)
+    events = alert_engine.check([alert.symbol])
+    events = [e for e in events if e["alert_id"] == alert.id]
+    return {
+        "alert": alert.to_dict(),
+        "events": events,
+        "analysis": f"""Alert #{alert.id} on {alert.symbol} ({alert.interval}): {alert.condition.text}
+{"Triggered now: " + events[-1]["message"] if events else "Not triggered on the latest bar"}"""
+    }
+
+
+def list_alerts(symbol: Optional[str] = None) -> Dict[str, Any]:
+    """
+    List registered alerts
+
+    Args:
+        symbol: Only list this symbol's alerts (default: all)
+
+    Returns:
+        Dictionary with the alerts and a summary table
+    """
+    alerts = [a.to_dict() for a in alert_engine.alerts(symbol)]
+    table = format_table(
+        ["ID", "Symbol", "Interval", "Condition", "Last bar", "Triggers"],
+        [[str(a["id"]), a["symbol"], a["interval"], a["condition"], a["last_bar"] or "-", str(a["triggers"])]
+         for a in alerts],
+    )
+    return {
+        "alerts": alerts,
+        "analysis": f"""# Alerts ({len(alerts)})
+
+{table}"""
+    }
+
+
+def remove_alert(alert_id: int) -> Dict[str, Any]:
+    """
+    Remove an alert
+
+    Args:
+        alert_id: ID returned when the alert was added
+
+    Returns:
+        Dictionary with the removed alert
+    """
+    alert = alert_engine.remove(alert_id)
+    return {
+        "alert": alert.to_dict(),
+        "analysis": f"Removed alert #{alert.id} on {alert.symbol}: {alert.condition.text}",
+    }
+
+
+def poll_alerts(since: int = 0, check: bool = True) -> Dict[str, Any]:
+    """
+    Fetch triggered alert events
+
+    Args:
+        since: Only return events after this sequence number (pass the previous "next_since")
+        check: Evaluate every alert against the cached bars first (no API calls)
+
+    Returns:
+        Dictionary with the events and the cursor for the next poll
+    """
+    if check:
+        alert_engine.check()
+    events: List[Dict[str, Any]] = alert_engine.events(since)
+    next_since = events[-1]["seq"] if events else since
+    lines = "\n".join(e["message"] for e in events) or "No new alerts"
+    return {
+        "events": events,
+        "next_since": next_since,
+        "analysis": f"""# Alert Events ({len(events)} new)
+
+{lines}"""
+    }
@@ -0,0 +1,211 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Sequence
+import numpy as np
+from tools.batch import format_errors, format_table, normalize_symbols
+from tools.trade_reco import (
+    CROSSOVER_LOOKBACK, CROSSOVER_WEIGHT, MA_WEIGHT, RSI_OVERBOUGHT, RSI_OVERSOLD, RSI_WEIGHT,
+)
+from utils.indicators import crossovers, rolling_mean, rsi_array
+from utils.indicator_store import indicator_store
+from utils.market_data import get_bars
+
+# Below this many bars in total, worker start-up costs more than it saves
+PARALLEL_MIN_BARS = 500_000
+
+
+def signal_strength(close: np.ndarray, short_period: int = 20, long_period: int = 50,
+                    rsi_period: int = 14) -> np.ndarray:
+    """
+    The trade_recommendation score evaluated at every bar at once:
+    MA trend +/-1, a crossover within the lookback +/-2 (the earliest one in
+    the window wins, as in calculate_moving_averages) and RSI extremes +/-1.5.
+    """
+    short_ma = rolling_mean(close, short_period)
+    long_ma = rolling_mean(close, long_period)
+    rsi = rsi_array(close, rsi_period)
+
+    score = MA_WEIGHT * (np.sign(short_ma - long_ma))
+    score = np.nan_to_num(score)
+
+    events = crossovers(short_ma, long_ma)
+    recent = np.zeros_like(events)
+    # Walk from the latest bar back, so the earliest cross in the window is written last
+    for lag in range(CROSSOVER_LOOKBACK - 1):
+        shifted = np.zeros_like(events)
+        shifted[lag:] = events[:len(events) - lag]
+        recent = np.where(shifted != 0, shifted, recent)
+    score = score + CROSSOVER_WEIGHT * recent
+
+    with np.errstate(invalid="ignore"):
+        score = score + RSI_WEIGHT * ((rsi < RSI_OVERSOLD).astype(float) - (rsi > RSI_OVERBOUGHT))
+    return score
+
+
+def run_backtest(close: np.ndarray, short_period: int = 20, long_period: int = 50, rsi_period: int = 14,
+                 allow_short: bool = False, cost_bps: float = 0.0) -> Dict[str, Any]:
+    """
+    Backtest the scoring rule on one close series: long while the score is a
+    buy, short (or flat) while it is a sell, flat on HOLD. Positions are taken
+    at the close of the signal bar and earn the next bar's return.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    score = signal_strength(close, short_period, long_period, rsi_period)
+    position = np.sign(score)
+    if not allow_short:
+        position = np.maximum(position, 0.0)
+
+    returns = np.zeros_like(close)
+    returns[1:] = close[1:] / close[:-1] - 1
+    held = np.zeros_like(position)
+    held[1:] = position[:-1]
+    turnover = np.abs(np.diff(position, prepend=0.0))
+    pnl = held * returns - turnover * cost_bps / 10_000
+
+    equity = np.cumprod(1 + pnl)
+    drawdown = equity / np.maximum.accumulate(equity) - 1 if len(equity) else equity
+
+    # Trades are runs of a constant non-zero held position
+    changes = np.flatnonzero(np.diff(held, prepend=0.0) != 0)
+    trade_returns = np.add.reduceat(np.log1p(pnl), changes) if len(changes) else np.array([])
+    in_trade = held[changes] != 0 if len(changes) else np.array([], dtype=bool)
+    trade_returns = trade_returns[in_trade]
+
+    bars_in_market = int(np.count_nonzero(held))
+    return {
+        "bars": int(len(close)),
+        "total_return": float(equity[-1] - 1) if len(equity) else 0.0,
+        "buy_and_hold_return": float(close[-1] / close[0] - 1) if len(close) > 1 else 0.0,
+        "max_drawdown": float(drawdown.min()) if len(drawdown) else 0.0,
+        "trades": int(len(trade_returns)),
+        "hit_rate": float(np.mean(trade_returns > 0)) if len(trade_returns) else None,
+        "avg_trade_return": float(np.expm1(trade_returns).mean()) if len(trade_returns) else None,
+        "exposure": bars_in_market / len(close) if len(close) else 0.0,
+        "final_position": float(position[-1]) if len(position) else 0.0,
+    }
+
+
+def _format_pct(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value * 100:.2f}%"
+
+
+def backtest_trade_rule(
+    symbol: str,
+    short_period: int = 20,
+    long_period: int = 50,
+    rsi_period: int = 14,
+    allow_short: bool = False,
+    cost_bps: float = 0.0,
+    interval: str = "1min",
+) -> Dict[str, Any]:
+    """
+    Backtest the trade_recommendation scoring rule over the cached history
+
+    Args:
+        symbol: The ticker symbol to analyze
+        short_period: Short moving average period in bars
+        long_period: Long moving average period in bars
+        rsi_period: RSI calculation period in bars
+        allow_short: Go short on SELL signals instead of staying flat
+        cost_bps: Transaction cost per unit of turnover, in basis points
+        interval: Bar size (1min, or 5min/15min/30min/60min/1d built from 1-minute bars)
+
+    Returns:
+        Dictionary with PnL, hit rate, drawdown and trade statistics
+    """
+    data = get_bars(symbol, interval)
+    params = (short_period, long_period, rsi_period, allow_short, cost_bps)
+    stats = indicator_store.get_or_compute(
+        symbol, interval, "backtest", params, data,
+        lambda: run_backtest(data["close"].to_numpy(), *params),
+    )
+    return _backtest_result(symbol, str(data.index[0]), str(data.index[-1]), stats)
+
+
+def _backtest_result(symbol: str, start: str, end: str, stats: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "symbol": symbol,
+        "from": start,
+        "to": end,
+        **stats,
+        "analysis": f"""Backtest of trade recommendation rule for {symbol} ({start} to {end}):
+Bars: {stats["bars"]}
+Total Return: {_format_pct(stats["total_return"])} (buy & hold {_format_pct(stats["buy_and_hold_return"])})
+Max Drawdown: {_format_pct(stats["max_drawdown"])}
+Trades: {stats["trades"]}
+Hit Rate: {_format_pct(stats["hit_rate"])}
+Time in Market: {_format_pct(stats["exposure"])}"""
+    }
+
+
+def backtest_batch(
+    symbols: Sequence[str],
+    short_period: int = 20,
+    long_period: int = 50,
+    rsi_period: int = 14,
+    allow_short: bool = False,
+    cost_bps: float = 0.0,
+    interval: str = "1min",
+    max_workers: Optional[int] = None,
+    failed: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Backtest the scoring rule for several symbols on a process pool
+
+    Args:
+        symbols: Ticker symbols to backtest
+        max_workers: Worker processes (default: CPU count)
+        failed: Symbols already known to have failed (e.g. during prefetch), with their error
+        (other arguments as in backtest_trade_rule)
+
+    Returns:
+        Dictionary with per-symbol statistics ranked by total return
+    """
+    symbols = normalize_symbols(symbols)
+    errors = dict(failed or {})
+    closes, spans = {}, {}
+    for symbol in symbols:
+        if symbol in errors:
+            continue
+        try:
+            data = get_bars(symbol, interval)
+        except Exception as exc:
+            errors[symbol] = str(exc)
+            continue
+        # Plain arrays are cheap to pickle; the workers never touch the cache
+        closes[symbol] = np.ascontiguousarray(data["close"].to_numpy(dtype=np.float64))
+        spans[symbol] = (str(data.index[0]), str(data.index[-1]))
+
+    params = (short_period, long_period, rsi_period, allow_short, cost_bps)
+    names = list(closes)
+    workers = min(max_workers or os.cpu_count() or 1, len(names))
+    if workers > 1 and sum(len(c) for c in closes.values()) >= PARALLEL_MIN_BARS:
+        # The server is multi-threaded, so don't fork it directly
+        context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            stats = list(pool.map(run_backtest, [closes[s] for s in names], *[[p] * len(names) for p in params]))
+    else:
+        stats = [run_backtest(closes[s], *params) for s in names]
+
+    results = [_backtest_result(s, *spans[s], st) for s, st in zip(names, stats)]
+    results.sort(key=lambda r: r["total_return"], reverse=True)
+    table = format_table(
+        ["#", "Symbol", "Return", "Buy&Hold", "Max DD", "Trades", "Hit Rate"],
+        [
+            [str(i + 1), r["symbol"], _format_pct(r["total_return"]), _format_pct(r["buy_and_hold_return"]),
+             _format_pct(r["max_drawdown"]), str(r["trades"]), _format_pct(r["hit_rate"])]
+            for i, r in enumerate(results)
+        ],
+    )
+    return {
+        "symbols": symbols,
+        "ranked": [{k: v for k, v in r.items() if k != "analysis"} for r in results],
+        "errors": errors,
+        "analysis": f"""# Trade Rule Backtest ({short_period}/{long_period} SMA, RSI {rsi_period})
+
+{table}
+{format_errors(errors)}"""
+    }
@@ -0,0 +1,150 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from tools.returns import calculate_returns
+from tools.trade_reco import trade_recommendation
+from utils.data_model import normalize_symbol
+
+MAX_WORKERS = 8
+
+
+def normalize_symbols(symbols: Sequence[str]) -> List[str]:
+    """Upper-case, strip and de-duplicate symbols, keeping their order."""
+    return list(dict.fromkeys(normalize_symbol(s) for s in symbols if s.strip()))
+
+
+def _run_batch(
+    fn: Callable[[str], Dict[str, Any]],
+    symbols: List[str],
+    max_workers: int,
+    failed: Optional[Dict[str, str]],
+):
+    """Run fn for every symbol on a thread pool, collecting per-symbol errors."""
+    errors = dict(failed or {})
+    todo = [s for s in symbols if s not in errors]
+
+    def run(symbol: str):
+        try:
+            return symbol, fn(symbol), None
+        except Exception as exc:
+            return symbol, None, str(exc)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(todo) or 1))) as pool:
+        for symbol, result, error in pool.map(run, todo):
+            if error is not None:
+                errors[symbol] = error
+            else:
+                results.append(result)
+    return results, errors
+
+
+def format_errors(errors: Dict[str, str]) -> str:
+    return "\n".join(["", "Failed:"] + [f"- {s}: {e}" for s, e in errors.items()]) if errors else ""
+
+
+def format_table(headers: List[str], rows: List[List[str]]) -> str:
+    widths = [max(len(h), *(len(r[i]) for r in rows)) if rows else len(h) for i, h in enumerate(headers)]
+    line = lambda cells: " | ".join(c.ljust(w) for c, w in zip(cells, widths))
+    return "\n".join([line(headers), "-+-".join("-" * w for w in widths)] + [line(r) for r in rows])
+
+
+def trade_recommendation_batch(
+    symbols: Sequence[str],
+    interval: str = "1min",
+    max_workers: int = MAX_WORKERS,
+    failed: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Run trade_recommendation for a watchlist and rank the results
+
+    Args:
+        symbols: Ticker symbols to analyze
+        interval: Bar size passed to trade_recommendation
+        max_workers: Threads used for the indicator calculations
+        failed: Symbols already known to have failed (e.g. during prefetch), with their error
+
+    Returns:
+        Dictionary with results ranked from strongest buy to strongest sell
+    """
+    symbols = normalize_symbols(symbols)
+    results, errors = _run_batch(lambda s: trade_recommendation(s, interval), symbols, max_workers, failed)
+    results.sort(key=lambda r: r["signal_strength"], reverse=True)
+
+    ranked = [
+        {
+            "rank": i + 1,
+            "symbol": r["symbol"],
+            "recommendation": r["recommendation"],
+            "signal_strength": r["signal_strength"],
+            "risk_level": r["risk_level"],
+            "current_price": r["current_price"],
+            "ma_signal": r["ma_signal"],
+            "rsi_signal": r["rsi_signal"],
+        }
+        for i, r in enumerate(results)
+    ]
+    table = format_table(
+        ["#", "Symbol", "Recommendation", "Strength", "Risk", "Price"],
+        [
+            [str(r["rank"]), r["symbol"], r["recommendation"], f"{r['signal_strength']:.1f}",
+             r["risk_level"], f"${r['current_price']:.2f}"]
+            for r in ranked
+        ],
+    )
+    return {
+        "symbols": symbols,
+        "ranked": ranked,
+        "errors": errors,
+        "analysis": f"""# Watchlist Trade Recommendations
+
+{table}
+{format_errors(errors)}"""
+    }
+
+
+def calculate_returns_batch(
+    symbols: Sequence[str],
+    start: str = "2020-01-01",
+    end: Optional[str] = None,
+    max_workers: int = MAX_WORKERS,
+    failed: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Calculate daily returns for several symbols and rank them by risk-adjusted return
+
+    Args:
+        symbols: Ticker symbols to analyze
+        start: Start date (YYYY-MM-DD)
+        end: End date (YYYY-MM-DD), defaults to today
+        max_workers: Threads used for the calculations
+        failed: Symbols already known to have failed (e.g. during prefetch), with their error
+
+    Returns:
+        Dictionary with per-symbol return statistics ranked by mean/std
+    """
+    symbols = normalize_symbols(symbols)
+    results, errors = _run_batch(lambda s: calculate_returns(s, start, end), symbols, max_workers, failed)
+    for r in results:
+        r["return_to_risk"] = r["mean_return"] / r["std_dev"] if r["std_dev"] else 0.0
+    # NaN ratios (e.g. too few returns) rank last; as sort keys they'd scramble the order
+    results.sort(key=lambda r: r["return_to_risk"] if math.isfinite(r["return_to_risk"]) else -math.inf,
+                 reverse=True)
+
+    table = format_table(
+        ["#", "Symbol", "Mean", "Std Dev", "Mean/Std", "Days"],
+        [
+            [str(i + 1), r["symbol"], f"{r['mean_return']:.5f}", f"{r['std_dev']:.5f}",
+             f"{r['return_to_risk']:.3f}", str(r["data_points"])]
+            for i, r in enumerate(results)
+        ],
+    )
+    return {
+        "symbols": symbols,
+        "ranked": results,
+        "errors": errors,
+        "analysis": f"""# Watchlist Returns ({start} to {end or 'today'})
+
+{table}
+{format_errors(errors)}"""
+    }
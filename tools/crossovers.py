@@ -0,0 +1,82 @@
+from typing import Any, Dict, Optional
+import numpy as np
+import pandas as pd
+from utils.market_data import get_bars
+from utils.indicators import crossovers, rolling_mean
+from utils.indicator_store import indicator_store
+
+# Most recent events listed in full; counts always cover the whole scan
+MAX_EVENTS = 50
+
+
+def sma_series(symbol: str, interval: str, data: pd.DataFrame, period: int) -> np.ndarray:
+    """Full-history SMA of the close, memoized until new bars arrive."""
+    return indicator_store.get_or_compute(
+        symbol, interval, "sma_series", period, data,
+        lambda: rolling_mean(data["close"].to_numpy(), period),
+    )
+
+
+def scan_crossovers(
+    symbol: str,
+    short_period: int = 20,
+    long_period: int = 50,
+    window: Optional[int] = None,
+    interval: str = "1min",
+) -> Dict[str, Any]:
+    """
+    Find every golden and death cross of two moving averages
+
+    Args:
+        symbol: The ticker symbol to analyze
+        short_period: Short moving average period in bars
+        long_period: Long moving average period in bars
+        window: Only scan the last N bars (default: the whole cached history)
+        interval: Bar size (1min, or 5min/15min/30min/60min/1d built from 1-minute bars)
+
+    Returns:
+        Dictionary with crossover events, counts and bars since the last cross
+    """
+    data = get_bars(symbol, interval)
+    short_ma = sma_series(symbol, interval, data, short_period)
+    long_ma = sma_series(symbol, interval, data, long_period)
+
+    start = max(0, len(data) - window) if window else 0
+    events = crossovers(short_ma[start:], long_ma[start:])
+    positions = np.flatnonzero(events)
+    index = data.index[start:]
+    closes = data["close"].to_numpy()[start:]
+
+    golden = int(np.count_nonzero(events > 0))
+    death = int(np.count_nonzero(events < 0))
+    bars_since = int(len(events) - 1 - positions[-1]) if len(positions) else None
+    last = None
+    recent = []
+    for pos in positions[-MAX_EVENTS:]:
+        recent.append({
+            "timestamp": str(index[pos]),
+            "type": "GOLDEN CROSS" if events[pos] > 0 else "DEATH CROSS",
+            "price": float(closes[pos]),
+            f"SMA{short_period}": float(short_ma[start + pos]),
+            f"SMA{long_period}": float(long_ma[start + pos]),
+        })
+    if recent:
+        last = recent[-1]
+
+    return {
+        "symbol": symbol,
+        "interval": interval,
+        "bars_scanned": int(len(events)),
+        "from": str(index[0]) if len(index) else None,
+        "to": str(index[-1]) if len(index) else None,
+        "golden_crosses": golden,
+        "death_crosses": death,
+        "last_crossover": last,
+        "bars_since_last_cross": bars_since,
+        "crossovers": recent,
+        "analysis": f"""Crossover Scan for {symbol} ({short_period}/{long_period} SMA):
+Bars scanned: {len(events)}
+Golden crosses: {golden}
+Death crosses: {death}
+Last crossover: {f"{last['type']} at {last['timestamp']} ({bars_since} bars ago)" if last else "None"}"""
+    }
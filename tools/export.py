@@ -0,0 +1,167 @@
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from utils.market_data import get_bars, get_daily
+from utils.market_hours import MARKET_TZ
+
+# Columns aggregated as candles when downsampling; any other column keeps its last value
+CANDLE_REDUCERS = {
+    "open": "first",
+    "high": np.maximum,
+    "low": np.minimum,
+    "close": "last",
+    "volume": np.add,
+    "dividend_amount": np.add,
+    "split_coefficient": np.multiply,
+}
+ENCODINGS = ("columnar", "csv")
+DEFAULT_PRECISION = 4
+
+
+def load_bars(symbol: str, interval: str = "1min") -> pd.DataFrame:
+    """Cached bars for symbol: "daily" is the adjusted daily history, anything else goes through get_bars."""
+    return get_daily(symbol) if interval == "daily" else get_bars(symbol, interval)
+
+
+def window(data: pd.DataFrame, start: Optional[str] = None, end: Optional[str] = None,
+           columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Timestamps (int64 ns, exchange-local like the bars) and the selected
+    columns for start <= t <= end.
+
+    The arrays are slices of the cached ones (views, not copies): the index is
+    sorted, so the range is two binary searches.
+    """
+    ts = pd.DatetimeIndex(data.index).asi8
+    lo = int(np.searchsorted(ts, pd.Timestamp(start).value, side="left")) if start else 0
+    hi = int(np.searchsorted(ts, pd.Timestamp(end).value, side="right")) if end else len(ts)
+    names = list(columns) if columns else list(data.columns)
+    missing = [c for c in names if c not in data.columns]
+    if missing:
+        raise ValueError(f"Unknown column(s) {', '.join(missing)}. Available: {', '.join(data.columns)}")
+    out = {"t": ts[lo:hi]}
+    for name in names:
+        out[name] = data[name].to_numpy()[lo:hi]
+    return out
+
+
+def downsample(arrays: Dict[str, np.ndarray], max_points: int,
+               volume: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Merge consecutive bars into at most max_points candles of (nearly) equal
+    bar counts: first open, max high, min low, last close, summed volume and
+    dividends, compounded split factors and a volume-weighted vwap (volume
+    is the window's volume, whether or not it is one of the exported columns).
+    Each candle is stamped with its first bar's time.
+    """
+    n = len(arrays["t"])
+    if max_points <= 0 or n <= max_points:
+        return arrays
+    starts = np.unique(np.linspace(0, n, max_points, endpoint=False).astype(np.int64))
+    ends = np.append(starts[1:], n) - 1
+    out = {}
+    for name, values in arrays.items():
+        reducer = CANDLE_REDUCERS.get(name, "first" if name == "t" else "last")
+        if name == "vwap":
+            out[name] = _weighted_mean(values, volume, starts)
+        elif reducer == "first":
+            out[name] = values[starts]
+        elif reducer == "last":
+            out[name] = values[ends]
+        else:
+            out[name] = reducer.reduceat(values, starts)
+    return out
+
+
+def _weighted_mean(values: np.ndarray, weights: Optional[np.ndarray], starts: np.ndarray) -> np.ndarray:
+    """Per-candle mean of values weighted by weights (plain mean without weights or volume)."""
+    values = values.astype(np.float64)
+    counts = np.diff(np.append(starts, len(values)))
+    plain = np.add.reduceat(values, starts) / counts
+    if weights is None:
+        return plain
+    weights = weights.astype(np.float64)
+    total = np.add.reduceat(weights, starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, np.add.reduceat(values * weights, starts) / total, plain)
+
+
+def epoch_seconds(ts: np.ndarray) -> np.ndarray:
+    """Exchange-local bar times (naive int64 ns, as Alpha Vantage reports them) to UTC epoch seconds."""
+    local = pd.DatetimeIndex(ts.view("datetime64[ns]"))
+    return local.tz_localize(MARKET_TZ, ambiguous=False, nonexistent="shift_forward").asi8 // 10**9
+
+
+def _encode_values(values: np.ndarray, precision: int) -> List[Any]:
+    if values.dtype.kind == "f":
+        # NaN isn't valid JSON
+        rounded = np.round(values, precision)
+        return [None if v != v else v for v in rounded.tolist()]
+    return values.tolist()
+
+
+def encode(arrays: Dict[str, np.ndarray], encoding: str = "columnar",
+           precision: int = DEFAULT_PRECISION) -> Dict[str, Any]:
+    """
+    columnar: {"t": [epoch seconds...], "close": [...], ...}, one array per column.
+    csv: a single header + rows string, for clients that want text.
+    "t" is UTC epoch seconds of the exchange-local bar times.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding '{encoding}'. Use one of: {', '.join(ENCODINGS)}")
+    t = epoch_seconds(arrays["t"])
+    if encoding == "csv":
+        names = [n for n in arrays if n != "t"]
+        columns = [t.tolist()] + [_encode_values(arrays[n], precision) for n in names]
+        lines = [",".join(["t"] + names)]
+        lines += [",".join("" if v is None else str(v) for v in row) for row in zip(*columns)]
+        return {"csv": "\n".join(lines)}
+    return {"t": t.tolist(), **{n: _encode_values(v, precision) for n, v in arrays.items() if n != "t"}}
+
+
+def export_bars(
+    symbol: str,
+    interval: str = "1min",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    max_points: Optional[int] = None,
+    encoding: str = "columnar",
+    precision: int = DEFAULT_PRECISION,
+) -> Dict[str, Any]:
+    """
+    Export cached OHLCV bars for a time window in a compact columnar form
+
+    Args:
+        symbol: The ticker symbol
+        interval: 1min, 5min, 15min, 30min, 60min, 1d (from intraday bars) or daily (adjusted history)
+        start: First timestamp to include, exchange-local (e.g. 2024-03-01 or 2024-03-01T10:00), default: oldest cached
+        end: Last timestamp to include, exchange-local, default: newest cached
+        columns: Columns to return (default: all)
+        max_points: Downsample to at most this many candles
+        encoding: "columnar" (one array per column) or "csv"
+        precision: Decimal places kept for prices
+
+    Returns:
+        Dictionary with the window's metadata and encoded bars; "from"/"to" are
+        exchange-local times and "t" is UTC epoch seconds
+    """
+    data = load_bars(symbol, interval)
+    arrays = window(data, start, end, columns)
+    bars = len(arrays["t"])
+    span = (str(pd.Timestamp(int(arrays["t"][0]))), str(pd.Timestamp(int(arrays["t"][-1])))) if bars else (None, None)
+    if max_points:
+        volume = window(data, start, end, ["volume"])["volume"] if "volume" in data.columns else None
+        arrays = downsample(arrays, max_points, volume)
+    return {
+        "symbol": symbol,
+        "interval": interval,
+        "from": span[0],
+        "to": span[1],
+        "timezone": str(MARKET_TZ),
+        "bars": bars,
+        "points": len(arrays["t"]),
+        "columns": [n for n in arrays if n != "t"],
+        "encoding": encoding,
+        **encode(arrays, encoding, precision),
+    }
@@ -1,8 +1,10 @@
 from typing import Any, Dict
-from utils.api import AlphaVantageAPI
-from utils.data_model import market_data_cache, MarketData
-from utils.indicators import sma
-from datetime import datetime
+import numpy as np
+import pandas as pd
+from utils.market_data import get_bars
+from utils.indicators import check_period, crossovers, sma
+from utils.indicator_engine import indicator_engine
+from utils.indicator_store import indicator_store
 
 # def calculate_moving_averages(symbol: str, short_period: int = 20, long_period: int = 50):
 #     cache_key = f"{symbol}_1min"
@@ -30,40 +32,42 @@ from datetime import datetime
 #     }
 
 
-def calculate_moving_averages(symbol: str, short_period: int = 20, long_period: int = 50) -> Dict[str, Any]:
+def calculate_moving_averages(symbol: str, short_period: int = 20, long_period: int = 50,
+                              interval: str = "1min") -> Dict[str, Any]:
     """
     Calculate short and long moving averages for a symbol
     
     Args:
         symbol: The ticker symbol to analyze
-        short_period: Short moving average period in minutes
-        long_period: Long moving average period in minutes
+        short_period: Short moving average period in bars
+        long_period: Long moving average period in bars
+        interval: Bar size (1min, or 5min/15min/30min/60min/1d built from 1-minute bars)
         
     Returns:
         Dictionary with moving average data and analysis
     """
-    cache_key = f"{symbol}_1min"
+    check_period(short_period, "short_period")
+    check_period(long_period, "long_period")
+    data = get_bars(symbol, interval)
     
-    if cache_key not in market_data_cache:
-        df = AlphaVantageAPI.get_intraday_data(symbol, "1min", outputsize="full")
-        market_data_cache[cache_key] = MarketData(
-            symbol=symbol,
-            interval="1min",
-            data=df,
-            last_updated=datetime.now()
-        )
-    
-    data = market_data_cache[cache_key].data
-    
-    # Calculate moving averages
-    data[f'SMA{short_period}'] = data['close'].rolling(window=short_period).mean()
-    data[f'SMA{long_period}'] = data['close'].rolling(window=long_period).mean()
+    # Reuse the previous result while no new bar has arrived
+    result = indicator_store.get_or_compute(
+        symbol, interval, "sma_signal", (short_period, long_period), data,
+        lambda: _analyze_moving_averages(symbol, data, short_period, long_period, interval),
+    )
+    return dict(result)
+
+
+def _analyze_moving_averages(symbol: str, data: pd.DataFrame, short_period: int, long_period: int,
+                             interval: str = "1min") -> Dict[str, Any]:
+    # Update streaming moving averages with the bars that arrived since the last call
+    short_state = indicator_engine.update(symbol, interval, "sma", short_period, data['close'])
+    long_state = indicator_engine.update(symbol, interval, "sma", long_period, data['close'])
     
     # Get latest values
-    latest = data.iloc[-1]
-    current_price = latest['close']
-    short_ma = latest[f'SMA{short_period}']
-    long_ma = latest[f'SMA{long_period}']
+    current_price = data['close'].iloc[-1]
+    short_ma = short_state.value
+    long_ma = long_state.value
     
     # Determine signal
     if short_ma > long_ma:
@@ -73,29 +77,18 @@ def calculate_moving_averages(symbol: str, short_period: int = 20, long_period:
     else:
         signal = "NEUTRAL (MAs are equal)"
     
-    # Check for crossover in the last 5 periods
-    last_5 = data.iloc[-5:]
-    crossover = False
+    # Check for crossover in the last 5 periods (the earliest one counts)
+    n = min(len(short_state.tail), len(long_state.tail))
+    events = crossovers(list(short_state.tail)[-n:], list(long_state.tail)[-n:])
+    crossed = np.flatnonzero(events)
+    crossover = len(crossed) > 0
     crossover_type = ""
-    
-    for i in range(1, len(last_5)):
-        prev = last_5.iloc[i-1]
-        curr = last_5.iloc[i]
-        
-        # Golden Cross (short crosses above long)
-        if prev[f'SMA{short_period}'] <= prev[f'SMA{long_period}'] and curr[f'SMA{short_period}'] > curr[f'SMA{long_period}']:
-            crossover = True
-            crossover_type = "GOLDEN CROSS (Bullish)"
-            break
-            
-        # Death Cross (short crosses below long)
-        if prev[f'SMA{short_period}'] >= prev[f'SMA{long_period}'] and curr[f'SMA{short_period}'] < curr[f'SMA{long_period}']:
-            crossover = True
-            crossover_type = "DEATH CROSS (Bearish)"
-            break
+    if crossover:
+        crossover_type = "GOLDEN CROSS (Bullish)" if events[crossed[0]] > 0 else "DEATH CROSS (Bearish)"
     
     return {
         "symbol": symbol,
+        "interval": interval,
         "current_price": current_price,
         f"SMA{short_period}": short_ma,
         f"SMA{long_period}": long_ma,
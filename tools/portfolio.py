@@ -0,0 +1,120 @@
+from statistics import NormalDist
+from typing import Any, Dict, Optional
+import numpy as np
+import pandas as pd
+from tools.batch import format_table, normalize_symbols
+from tools.returns import daily_returns
+from utils.data_model import normalize_symbol
+from utils.indicators import rolling_means
+
+TRADING_DAYS = 252
+
+
+def aligned_returns(symbols, start: str = "2020-01-01", end: Optional[str] = None) -> pd.DataFrame:
+    """Daily returns of several symbols on the dates they all traded (date x symbol)."""
+    columns = [daily_returns(s, start, end) for s in symbols]
+    return pd.concat(columns, axis=1, keys=list(symbols), join="inner", copy=False).dropna()
+
+
+def max_drawdown(returns: np.ndarray) -> float:
+    equity = np.cumprod(1 + returns)
+    return float((equity / np.maximum.accumulate(equity) - 1).min()) if len(equity) else 0.0
+
+
+def rolling_volatility(returns: np.ndarray, window: int) -> np.ndarray:
+    """Annualized rolling sample volatility, from rolling means of r and r^2."""
+    means = rolling_means(np.column_stack([returns, returns * returns]), [window])[window]
+    variance = (means[:, 1] - means[:, 0] ** 2) * window / max(window - 1, 1)
+    return np.sqrt(np.clip(variance, 0.0, None) * TRADING_DAYS)
+
+
+def portfolio_risk(
+    weights: Dict[str, float],
+    start: str = "2020-01-01",
+    end: Optional[str] = None,
+    benchmark: Optional[str] = "SPY",
+    window: int = 21,
+    confidence: float = 0.95,
+) -> Dict[str, Any]:
+    """
+    Risk analytics for a weighted portfolio of daily-adjusted series
+
+    Args:
+        weights: Portfolio weights by symbol (normalized to sum to 1)
+        start: Start date (YYYY-MM-DD)
+        end: End date (YYYY-MM-DD), defaults to today
+        benchmark: Symbol the portfolio beta is measured against (None to skip)
+        window: Rolling volatility window in trading days
+        confidence: Value-at-risk confidence level
+
+    Returns:
+        Dictionary with covariance, volatility, drawdown, beta and one-day VaR
+    """
+    by_symbol: Dict[str, float] = {}
+    for symbol, weight in weights.items():
+        for s in normalize_symbols([symbol]):
+            by_symbol[s] = by_symbol.get(s, 0.0) + float(weight)
+    symbols = list(by_symbol)
+    w = np.array(list(by_symbol.values()))
+    if not len(symbols) or w.sum() == 0:
+        raise ValueError("Weights must name at least one symbol and not sum to zero")
+    w = w / w.sum()
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+
+    if benchmark:
+        benchmark = normalize_symbol(benchmark)
+    universe = symbols + ([benchmark] if benchmark and benchmark not in symbols else [])
+    returns = aligned_returns(universe, start, end)
+    if len(returns) < 2:
+        raise ValueError(f"Not enough overlapping daily data from {start} to {end or 'today'}")
+
+    matrix = returns[symbols].to_numpy(dtype=np.float64)
+    cov = np.cov(matrix, rowvar=False).reshape(len(symbols), len(symbols)) * TRADING_DAYS
+    portfolio = matrix @ w
+    volatility = float(np.sqrt(w @ cov @ w))
+    rolling = rolling_volatility(portfolio, window) if len(portfolio) >= window else np.array([])
+    alpha = 1 - confidence
+    historical_var = float(-np.quantile(portfolio, alpha))
+    parametric_var = float(NormalDist().inv_cdf(confidence) * portfolio.std(ddof=1) - portfolio.mean())
+
+    beta = None
+    if benchmark:
+        bench = returns[benchmark].to_numpy(dtype=np.float64)
+        bench_var = bench.var(ddof=1)
+        beta = float(np.cov(portfolio, bench)[0, 1] / bench_var) if bench_var > 0 else None
+
+    drawdown = max_drawdown(portfolio)
+    total = float(np.prod(1 + portfolio) - 1)
+    vols = np.sqrt(np.diag(cov))
+    table = format_table(
+        ["Symbol", "Weight", "Ann. Vol", "Risk Contribution"],
+        [[s, f"{w[i] * 100:.1f}%", f"{vols[i] * 100:.2f}%",
+          f"{(w[i] * (cov @ w)[i] / volatility ** 2) * 100:.1f}%" if volatility else "n/a"]
+         for i, s in enumerate(symbols)],
+    )
+    return {
+        "symbols": symbols,
+        "weights": dict(zip(symbols, w.tolist())),
+        "from": str(returns.index[0].date()),
+        "to": str(returns.index[-1].date()),
+        "days": int(len(portfolio)),
+        "total_return": total,
+        "annualized_volatility": volatility,
+        "rolling_volatility": float(rolling[-1]) if len(rolling) else None,
+        "max_drawdown": drawdown,
+        "beta": beta,
+        "benchmark": benchmark,
+        "var_historical": historical_var,
+        "var_parametric": parametric_var,
+        "covariance": {s: dict(zip(symbols, row.tolist())) for s, row in zip(symbols, cov)},
+        "analysis": f"""Portfolio Risk ({returns.index[0].date()} to {returns.index[-1].date()}, {len(portfolio)} days):
+Total Return: {total * 100:.2f}%
+Annualized Volatility: {volatility * 100:.2f}%
+{window}-day Rolling Volatility: {f"{rolling[-1] * 100:.2f}%" if len(rolling) else "not enough data"}
+Max Drawdown: {drawdown * 100:.2f}%
+Beta vs {benchmark or "n/a"}: {f"{beta:.2f}" if beta is not None else "n/a"}
+1-day VaR ({confidence:.0%}): {historical_var * 100:.2f}% historical, {parametric_var * 100:.2f}% parametric
+
+{table}"""
+    }
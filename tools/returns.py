@@ -1,58 +1,73 @@
 # analysis.py
 from typing import Dict, Any, Optional
-from datetime import datetime, date
+from datetime import date
 import pandas as pd
 
-from utils.api import AlphaVantageAPI
-from utils.data_model import market_data_cache, MarketData
+from utils.indicator_store import indicator_store
+from utils.market_data import get_daily
  
 
 
+def date_slice(df, start: str, end: Optional[str] = None):
+    """
+    Rows of a frame (or series) with start <= date <= end.
+
+    Bars come out of the parser and the bar store with a sorted, tz-naive
+    DatetimeIndex, so the range is found by binary search and returned as a
+    positional slice (a view, not a copy).
+    """
+    lo = df.index.searchsorted(pd.Timestamp(start).tz_localize(None), side="left")
+    hi = df.index.searchsorted(pd.Timestamp(end).tz_localize(None), side="right") if end else len(df)
+    return df.iloc[lo:hi]
+
+
 # New: unified daily fetch with caching
 def fetch_stock_data(symbol: str, start: str = "2020-01-01", end: Optional[str] = None) -> pd.DataFrame:
     """
     Returns a filtered daily-adjusted price DataFrame with at least 'adjusted_close'.
-    Uses local cache keyed by symbol_1d.
+    Uses the market data cache keyed by symbol_1d (expires after a day).
     """
-    cache_key = f"{symbol}_1d"
-    if cache_key not in market_data_cache:
-        df_daily = AlphaVantageAPI.get_daily_adjusted(symbol, outputsize="full")
-        market_data_cache[cache_key] = MarketData(symbol, "1d", df_daily, datetime.now())
-    else:
-        df_daily = market_data_cache[cache_key].data
-
-    # Filter by date range
-    start_dt = pd.to_datetime(start).tz_localize(None)
-    end_dt = pd.to_datetime(end).tz_localize(None) if end else None
-
-    df = df_daily.copy()
-    df.index = pd.to_datetime(df.index).tz_localize(None)
-
-    if end_dt:
-        df = df.loc[(df.index >= start_dt) & (df.index <= end_dt)]
-    else:
-        df = df.loc[df.index >= start_dt]
+    df = date_slice(get_daily(symbol), start, end)
 
     if df.empty:
         raise ValueError(f"No daily data in range for {symbol} from {start} to {end or 'today'}")
 
     return df
 
-# Integrated daily returns calculation
-def calculate_returns(symbol: str, start: str = "2020-01-01", end: Optional[str] = None) -> Dict[str, Any]:
-    """
-    Calculate daily simple returns based on adjusted close.
-    """
-    df = fetch_stock_data(symbol, start, end)
 
+def price_column(df: pd.DataFrame) -> str:
     # Prefer adjusted_close if available; fall back to close
     price_col = "adjusted_close" if "adjusted_close" in df.columns else "close"
     if price_col not in df.columns:
         raise ValueError("Required price column not found in daily data")
+    return price_col
 
-    # Compute returns; pct_change naturally introduces a NaN at the first row
-    returns = df[price_col].pct_change()
-    returns = returns.dropna()
+
+def daily_returns(symbol: str, start: str = "2020-01-01", end: Optional[str] = None) -> pd.Series:
+    """
+    Daily simple returns between start and end.
+
+    The return series over the whole history is computed once per set of bars
+    and memoized; each call only slices it. The first bar in range has no
+    return, exactly as with pct_change over the sliced prices.
+    """
+    data = get_daily(symbol)
+    price_col = price_column(data)
+    returns = indicator_store.get_or_compute(
+        symbol, "1d", "returns", price_col, data, lambda: data[price_col].pct_change()
+    )
+    returns = date_slice(returns, start, end)
+    if returns.empty:
+        raise ValueError(f"No daily data in range for {symbol} from {start} to {end or 'today'}")
+    return returns.iloc[1:]
+
+
+# Integrated daily returns calculation
+def calculate_returns(symbol: str, start: str = "2020-01-01", end: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Calculate daily simple returns based on adjusted close.
+    """
+    returns = daily_returns(symbol, start, end).dropna()
 
     result = {
         "symbol": symbol,
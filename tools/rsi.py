@@ -1,53 +1,44 @@
 from typing import Any, Dict
-from utils.api import AlphaVantageAPI
-from utils.data_model import market_data_cache, MarketData
-from datetime import datetime
+import pandas as pd
+from utils.market_data import get_bars
+from utils.indicator_engine import indicator_engine
+from utils.indicator_store import indicator_store
+from utils.indicators import check_period, wilder_rsi
 
 
-def calculate_rsi(symbol: str, period: int = 14) -> Dict[str, Any]:
+def calculate_rsi(symbol: str, period: int = 14, method: str = "simple", interval: str = "1min") -> Dict[str, Any]:
     """
     Calculate Relative Strength Index (RSI) for a symbol
     
     Args:
         symbol: The ticker symbol to analyze
-        period: RSI calculation period in minutes
+        period: RSI calculation period in bars
+        method: "simple" (rolling average gain/loss) or "wilder" (Wilder smoothing)
+        interval: Bar size (1min, or 5min/15min/30min/60min/1d built from 1-minute bars)
         
     Returns:
         Dictionary with RSI data and analysis
     """
-    cache_key = f"{symbol}_1min"
+    check_period(period)
+    data = get_bars(symbol, interval)
     
-    if cache_key not in market_data_cache:
-        df = AlphaVantageAPI.get_intraday_data(symbol, "1min", outputsize="full")
-        market_data_cache[cache_key] = MarketData(
-            symbol=symbol,
-            interval="1min",
-            data=df,
-            last_updated=datetime.now()
-        )
-    
-    data = market_data_cache[cache_key].data.copy()
-    
-    # Calculate price changes
-    delta = data['close'].diff()
-    
-    # Create gain and loss series
-    gain = delta.copy()
-    loss = delta.copy()
-    gain[gain < 0] = 0
-    loss[loss > 0] = 0
-    loss = abs(loss)
-    
-    # Calculate average gain and loss
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
-    
-    # Calculate RS and RSI
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    
-    # Get latest RSI
-    latest_rsi = rsi.iloc[-1]
+    # Reuse the previous result while no new bar has arrived
+    if method not in ("simple", "wilder"):
+        raise ValueError(f"Unknown RSI method '{method}'. Use 'simple' or 'wilder'.")
+    result = indicator_store.get_or_compute(
+        symbol, interval, "rsi_signal", (period, method), data,
+        lambda: _analyze_rsi(symbol, data, period, method, interval),
+    )
+    return dict(result)
+
+
+def _analyze_rsi(symbol: str, data: pd.DataFrame, period: int, method: str,
+                 interval: str = "1min") -> Dict[str, Any]:
+    if method == "wilder":
+        latest_rsi = float(wilder_rsi(data['close'].to_numpy(), period)[-1])
+    else:
+        # Update the streaming RSI (running average gain/loss) with any new bars
+        latest_rsi = indicator_engine.update(symbol, interval, "rsi", period, data['close']).value
     
     # Determine signal
     if latest_rsi < 30:
@@ -60,6 +51,8 @@ def calculate_rsi(symbol: str, period: int = 14) -> Dict[str, Any]:
     return {
         "symbol": symbol,
         "period": period,
+        "interval": interval,
+        "method": method,
         "rsi": latest_rsi,
         "signal": signal,
         "analysis": f"""RSI Analysis for {symbol}:
@@ -0,0 +1,200 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from tools.batch import format_table, normalize_symbols
+from utils.bar_store import bar_store
+from utils.data_model import market_data_cache
+from utils.indicator_store import bar_version
+from utils.indicators import rolling_means, rsi_array
+from utils.market_data import cached_bars
+from utils.resample import RESAMPLED_INTERVALS
+
+
+def cached_symbols(interval: str = "1min") -> List[str]:
+    if interval in RESAMPLED_INTERVALS:
+        interval = "1min"
+    suffix = f"_{interval}"
+    in_memory = [key[:-len(suffix)] for key in market_data_cache if key.endswith(suffix)]
+    return sorted(set(in_memory) | set(bar_store.symbols(interval)))
+
+
+# Close matrices kept between screens, keyed by (interval, lookback, symbols)
+MAX_MATRICES = 8
+
+
+class _CloseMatrix:
+    __slots__ = ("versions", "tails", "index", "closes")
+
+    def __init__(self, versions: List[Tuple], tails: List[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+                 index: np.ndarray, closes: np.ndarray):
+        self.versions = versions
+        # Per symbol: timestamps of its last bars, and the timestamps/closes with NaN closes dropped
+        self.tails = tails
+        self.index = index
+        self.closes = closes
+
+
+_matrices: "OrderedDict[Tuple, _CloseMatrix]" = OrderedDict()
+_matrices_lock = threading.Lock()
+
+
+def _tail(data: pd.DataFrame, lookback: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    ts = pd.DatetimeIndex(data.index).asi8[-lookback:]
+    closes = data["close"].to_numpy(dtype=np.float64)[-lookback:]
+    valid = ~np.isnan(closes)
+    return ts, ts[valid], closes[valid]
+
+
+def _column(tail: Tuple[np.ndarray, np.ndarray, np.ndarray], index: np.ndarray) -> np.ndarray:
+    """A symbol's close at each index time: its last valid bar at or before it (NaN before the first)."""
+    _, ts, closes = tail
+    pos = np.searchsorted(ts, index, side="right") - 1
+    column = closes[np.maximum(pos, 0)] if len(closes) else np.full(len(index), np.nan)
+    column[pos < 0] = np.nan
+    return column
+
+
+def _build_matrix(entry: Optional[_CloseMatrix], versions: List[Tuple],
+                  tails: List[Tuple[np.ndarray, np.ndarray, np.ndarray]], lookback: int) -> _CloseMatrix:
+    index = np.unique(np.concatenate([t[0] for t in tails]))[-lookback:]
+    closes = np.empty((len(index), len(tails)))
+    changed = range(len(tails))
+    if entry is not None:
+        # Times at or before the previous last row; the rest were appended since
+        kept = int(np.searchsorted(index, entry.index[-1], side="right")) if len(entry.index) else 0
+        if kept and np.array_equal(index[:kept], entry.index[len(entry.index) - kept:]):
+            # Rows shifted by the new times: unchanged symbols have no bars there and carry their last close
+            closes[:kept] = entry.closes[len(entry.index) - kept:]
+            closes[kept:] = entry.closes[-1]
+            changed = [i for i, v in enumerate(versions) if v != entry.versions[i]]
+    for i in changed:
+        closes[:, i] = _column(tails[i], index)
+    closes.flags.writeable = False
+    return _CloseMatrix(versions, tails, index, closes)
+
+
+def aligned_closes(
+    symbols: List[str], interval: str = "1min", lookback: int = 500
+) -> Tuple[pd.DatetimeIndex, np.ndarray, List[str], List[str]]:
+    """
+    Align the last `lookback` cached closes of many symbols into one
+    time x symbol array, forward-filling bars a symbol didn't trade.
+
+    The matrix is kept between calls and checked against the bar_version of
+    each symbol's closes: when nothing changed it is returned as is, and when
+    some symbols got new bars only their columns are gathered again (the
+    others are shifted to the new rows). The array is read-only.
+
+    Returns (index, closes, symbols found, symbols missing from the cache).
+    """
+    frames, found, missing = [], [], []
+    for symbol in symbols:
+        data = cached_bars(symbol, interval)
+        if data is None or not len(data):
+            missing.append(symbol)
+            continue
+        frames.append(data)
+        found.append(symbol)
+    if not found:
+        return pd.DatetimeIndex([]), np.empty((0, 0)), found, missing
+
+    key = (interval, lookback, tuple(found))
+    versions = [bar_version(data, ("close",)) for data in frames]
+    with _matrices_lock:
+        entry = _matrices.get(key)
+        if entry is not None:
+            _matrices.move_to_end(key)
+    if entry is None or entry.versions != versions:
+        tails = [
+            entry.tails[i] if entry is not None and entry.versions[i] == v else _tail(frames[i], lookback)
+            for i, v in enumerate(versions)
+        ]
+        entry = _build_matrix(entry, versions, tails, lookback)
+        with _matrices_lock:
+            _matrices[key] = entry
+            _matrices.move_to_end(key)
+            while len(_matrices) > MAX_MATRICES:
+                _matrices.popitem(last=False)
+    return pd.DatetimeIndex(entry.index.view("datetime64[ns]")), entry.closes, found, missing
+
+
+def screen_symbols(
+    symbols: Optional[List[str]] = None,
+    rsi_below: Optional[float] = 30,
+    rsi_above: Optional[float] = None,
+    trend: Optional[str] = "bullish",
+    short_period: int = 20,
+    long_period: int = 50,
+    rsi_period: int = 14,
+    interval: str = "1min",
+) -> Dict[str, Any]:
+    """
+    Screen a universe of symbols on RSI and moving average trend from cached data
+
+    Args:
+        symbols: Universe to screen (default: every symbol in the local cache)
+        rsi_below: Keep symbols whose RSI is below this value
+        rsi_above: Keep symbols whose RSI is above this value
+        trend: "bullish" (short SMA above long), "bearish" (below) or None for either
+        short_period: Short moving average period in bars
+        long_period: Long moving average period in bars
+        rsi_period: RSI calculation period in bars
+        interval: Bar interval of the cached series to screen
+
+    Returns:
+        Dictionary with the matching symbols and their indicator values
+    """
+    if trend not in (None, "bullish", "bearish"):
+        raise ValueError("trend must be 'bullish', 'bearish' or None")
+    universe = normalize_symbols(symbols) if symbols else cached_symbols(interval)
+    lookback = max(short_period, long_period, rsi_period + 1) + 1
+    index, closes, found, missing = aligned_closes(universe, interval, lookback)
+
+    matches = []
+    if len(found):
+        # Every column is computed in the same vectorized pass
+        means = rolling_means(closes, [short_period, long_period])
+        short_ma, long_ma = means[short_period][-1], means[long_period][-1]
+        rsi = rsi_array(closes, rsi_period)[-1]
+
+        mask = ~np.isnan(rsi) & ~np.isnan(short_ma) & ~np.isnan(long_ma)
+        if rsi_below is not None:
+            mask &= rsi < rsi_below
+        if rsi_above is not None:
+            mask &= rsi > rsi_above
+        if trend == "bullish":
+            mask &= short_ma > long_ma
+        elif trend == "bearish":
+            mask &= short_ma < long_ma
+
+        for i in np.flatnonzero(mask)[np.argsort(rsi[mask])]:
+            matches.append({
+                "symbol": found[i],
+                "price": float(closes[-1, i]),
+                "rsi": float(rsi[i]),
+                f"SMA{short_period}": float(short_ma[i]),
+                f"SMA{long_period}": float(long_ma[i]),
+            })
+
+    criteria = [f"RSI({rsi_period}) < {rsi_below}" if rsi_below is not None else None,
+                f"RSI({rsi_period}) > {rsi_above}" if rsi_above is not None else None,
+                f"SMA{short_period} {'>' if trend == 'bullish' else '<'} SMA{long_period}" if trend else None]
+    criteria_text = " and ".join(c for c in criteria if c) or "none"
+    table = format_table(
+        ["Symbol", "Price", "RSI", f"SMA{short_period}", f"SMA{long_period}"],
+        [[m["symbol"], f"${m['price']:.2f}", f"{m['rsi']:.2f}", f"{m[f'SMA{short_period}']:.2f}",
+          f"{m[f'SMA{long_period}']:.2f}"] for m in matches],
+    )
+    return {
+        "criteria": criteria_text,
+        "as_of": str(index[-1]) if len(index) else None,
+        "screened": len(found),
+        "missing": missing,
+        "matches": matches,
+        "analysis": f"""Screen: {criteria_text}
+Screened {len(found)} symbols from cache{f" ({len(missing)} not cached)" if missing else ""}, {len(matches)} matched.
+
+{table}"""
+    }
@@ -0,0 +1,39 @@
+from typing import Any, Dict
+from tools.batch import format_table
+from utils.metrics import metrics
+
+
+def server_metrics(reset: bool = False) -> Dict[str, Any]:
+    """
+    Counters, cache statistics and latency histograms collected since start-up
+
+    Args:
+        reset: Clear the counters and histograms after reading them
+
+    Returns:
+        Dictionary with the metrics snapshot and a readable summary
+    """
+    snapshot = metrics.snapshot()
+    if reset:
+        metrics.reset()
+    latency = format_table(
+        ["Span", "Count", "Mean", "p50", "p95", "p99", "Max"],
+        [[name, str(h["count"]), f"{h['mean_ms']:.2f}ms", f"{h['p50_ms']:.2f}ms", f"{h['p95_ms']:.2f}ms",
+          f"{h['p99_ms']:.2f}ms", f"{h['max_ms']:.2f}ms"] for name, h in snapshot["latency"].items()],
+    )
+    counters = "\n".join(f"{name}: {value}" for name, value in snapshot["counters"].items()) or "none"
+    cache = snapshot["market_data_cache"]
+    memo = snapshot["indicator_store"]
+    return {
+        **snapshot,
+        "analysis": f"""# Server Metrics (up {snapshot["uptime_s"]:.0f}s)
+
+## Counters
+{counters}
+Bar cache: {cache["hits"]} hits / {cache["misses"]} misses, {cache["entries"]} entries ({cache["bytes"] / 1e6:.1f} MB)
+Indicator store: {memo["hits"]} hits / {memo["misses"]} misses, {memo["entries"]} entries
+API quota left: {snapshot["request_scheduler"]["remaining_minute"]:.1f} this minute, {snapshot["request_scheduler"]["remaining_day"]:.0f} today
+
+## Latency
+{latency}"""
+    }
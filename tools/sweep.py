@@ -0,0 +1,101 @@
+from typing import Any, Dict, List, Optional
+import numpy as np
+from tools.batch import format_table
+from utils.indicators import check_period, rolling_means
+from utils.indicator_store import indicator_store
+from utils.market_data import get_bars
+
+DEFAULT_SHORT_PERIODS = [5, 10, 15, 20, 30]
+DEFAULT_LONG_PERIODS = [30, 50, 100, 150, 200]
+
+
+def score_crossover_pair(close_returns: np.ndarray, short_ma: np.ndarray, long_ma: np.ndarray,
+                         allow_short: bool = False) -> Dict[str, float]:
+    """Performance of holding long (or short) while the short SMA is above (below) the long one."""
+    with np.errstate(invalid="ignore"):
+        position = np.sign(short_ma - long_ma)
+    position = np.nan_to_num(position)
+    if not allow_short:
+        position = np.maximum(position, 0.0)
+    held = position[:-1]
+    pnl = held * close_returns
+    total = float(np.expm1(np.log1p(pnl).sum())) if len(pnl) else 0.0
+    std = float(pnl.std())
+    return {
+        "total_return": total,
+        "sharpe_per_bar": float(pnl.mean() / std) if std > 0 else 0.0,
+        "switches": int(np.count_nonzero(np.diff(held))),
+        "exposure": float(np.count_nonzero(held) / len(held)) if len(held) else 0.0,
+    }
+
+
+def sweep_sma_periods(
+    symbol: str,
+    short_periods: Optional[List[int]] = None,
+    long_periods: Optional[List[int]] = None,
+    allow_short: bool = False,
+    top: int = 10,
+    interval: str = "1min",
+) -> Dict[str, Any]:
+    """
+    Grid-search short/long SMA crossover periods over the cached history
+
+    Args:
+        symbol: The ticker symbol to analyze
+        short_periods: Candidate short moving average periods in bars
+        long_periods: Candidate long moving average periods in bars
+        allow_short: Score short positions while the short SMA is below the long one
+        top: Number of best pairs listed in the analysis
+        interval: Bar size (1min, or 5min/15min/30min/60min/1d built from 1-minute bars)
+
+    Returns:
+        Dictionary with every (short, long) pair scored and ranked by total return
+    """
+    short_periods = sorted(set(short_periods or DEFAULT_SHORT_PERIODS))
+    long_periods = sorted(set(long_periods or DEFAULT_LONG_PERIODS))
+    # Validate the grid before spending a fetch on it
+    for period in short_periods + long_periods:
+        check_period(period, "SMA periods")
+    if short_periods[0] >= long_periods[-1]:
+        raise ValueError("No valid (short, long) pairs: every short period must be below a long period")
+    data = get_bars(symbol, interval)
+
+    def compute() -> List[Dict[str, Any]]:
+        close = data["close"].to_numpy(dtype=np.float64)
+        returns = close[1:] / close[:-1] - 1
+        # One prefix sum serves every window in the grid
+        smas = rolling_means(close, sorted(set(short_periods) | set(long_periods)))
+        results = []
+        for short in short_periods:
+            for long in long_periods:
+                if short >= long:
+                    continue
+                stats = score_crossover_pair(returns, smas[short], smas[long], allow_short)
+                results.append({"short_period": short, "long_period": long, **stats})
+        results.sort(key=lambda r: r["total_return"], reverse=True)
+        return results
+
+    params = (tuple(short_periods), tuple(long_periods), allow_short)
+    results = indicator_store.get_or_compute(symbol, interval, "sma_sweep", params, data, compute)
+
+    table = format_table(
+        ["#", "Short", "Long", "Return", "Sharpe/bar", "Switches", "Exposure"],
+        [
+            [str(i + 1), str(r["short_period"]), str(r["long_period"]), f"{r['total_return'] * 100:.2f}%",
+             f"{r['sharpe_per_bar']:.4f}", str(r["switches"]), f"{r['exposure'] * 100:.1f}%"]
+            for i, r in enumerate(results[:top])
+        ],
+    )
+    best = results[0]
+    return {
+        "symbol": symbol,
+        "interval": interval,
+        "bars": int(len(data)),
+        "pairs_tested": len(results),
+        "best": best,
+        "ranked": [dict(r) for r in results],
+        "analysis": f"""SMA Crossover Sweep for {symbol} ({len(results)} pairs over {len(data)} bars):
+Best: {best["short_period"]}/{best["long_period"]} SMA -> {best["total_return"] * 100:.2f}%
+
+{table}"""
+    }
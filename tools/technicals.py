@@ -0,0 +1,67 @@
+import math
+from typing import Any, Dict, List, Optional
+from utils.market_data import get_bars
+from utils.indicators import compute_indicators
+from utils.indicator_store import indicator_store
+
+DEFAULT_INDICATORS = ["sma:20", "ema:20", "rsi:14", "macd:12,26,9", "bollinger:20,2", "atr:14", "vwap"]
+
+
+def _latest(values) -> Optional[float]:
+    value = float(values[-1]) if len(values) else math.nan
+    return None if math.isnan(value) else value
+
+
+def _describe(spec: str, latest: Dict[str, Optional[float]], price: float) -> str:
+    name = spec.split(":")[0]
+    if any(v is None for v in latest.values()):
+        return f"{spec}: not enough data"
+    if name in ("sma", "ema", "vwap"):
+        value = latest["value"]
+        return f"{spec}: {value:.2f} (price {'above' if price > value else 'below'})"
+    if name in ("rsi", "wilder_rsi"):
+        value = latest["value"]
+        zone = "OVERSOLD" if value < 30 else "OVERBOUGHT" if value > 70 else "NEUTRAL"
+        return f"{spec}: {value:.2f} ({zone})"
+    if name == "macd":
+        trend = "BULLISH" if latest["histogram"] > 0 else "BEARISH"
+        return f"{spec}: {latest['macd']:.4f} vs signal {latest['signal']:.4f} ({trend})"
+    if name == "bollinger":
+        position = ("above upper band" if price > latest["upper"] else
+                    "below lower band" if price < latest["lower"] else "inside bands")
+        return f"{spec}: {latest['lower']:.2f} / {latest['middle']:.2f} / {latest['upper']:.2f} (price {position})"
+    return f"{spec}: {latest['value']:.4f}"
+
+
+def calculate_indicators(symbol: str, indicators: Optional[List[str]] = None, interval: str = "1min") -> Dict[str, Any]:
+    """
+    Calculate a bundle of technical indicators for a symbol in one pass
+
+    Args:
+        symbol: The ticker symbol to analyze
+        indicators: Indicator specs such as "sma:20", "ema:12", "rsi:14", "wilder_rsi:14",
+            "macd:12,26,9", "bollinger:20,2", "atr:14" or "vwap" (default: a standard set)
+        interval: Bar size (1min, or 5min/15min/30min/60min/1d built from 1-minute bars)
+
+    Returns:
+        Dictionary with the latest value of every requested indicator
+    """
+    specs = tuple(indicators or DEFAULT_INDICATORS)
+    data = get_bars(symbol, interval)
+
+    def compute() -> Dict[str, Any]:
+        series = compute_indicators(data, specs)
+        price = float(data["close"].iloc[-1])
+        latest = {spec: {k: _latest(v) for k, v in outputs.items()} for spec, outputs in series.items()}
+        lines = "\n".join(_describe(spec, values, price) for spec, values in latest.items())
+        return {
+            "symbol": symbol,
+            "interval": interval,
+            "current_price": price,
+            "indicators": latest,
+            "analysis": f"""Technical Indicators for {symbol}:
+Current Price: ${price:.2f}
+{lines}"""
+        }
+
+    return dict(indicator_store.get_or_compute(symbol, interval, "bundle", specs, data, compute))
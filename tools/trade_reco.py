@@ -1,21 +1,33 @@
 from typing import Any, Dict
 from tools.moving_average import calculate_moving_averages
 from tools.rsi import calculate_rsi
+from utils.metrics import metrics
 
+# Scoring rule weights, shared with the vectorized backtest in tools/backtest.py
+MA_WEIGHT = 1
+CROSSOVER_WEIGHT = 2
+RSI_WEIGHT = 1.5
+RSI_OVERSOLD = 30
+RSI_OVERBOUGHT = 70
+STRONG_SIGNAL = 2
+# Bars inspected for a recent crossover by calculate_moving_averages
+CROSSOVER_LOOKBACK = 5
 
-def trade_recommendation(symbol: str) -> Dict[str, Any]:
+
+def trade_recommendation(symbol: str, interval: str = "1min") -> Dict[str, Any]:
     """
     Provide a comprehensive trade recommendation based on multiple indicators
     
     Args:
         symbol: The ticker symbol to analyze
+        interval: Bar size (1min, or 5min/15min/30min/60min/1d built from 1-minute bars)
         
     Returns:
         Dictionary with trading recommendation and supporting data
     """
     # Calculate individual indicators
-    ma_data = calculate_moving_averages(symbol)
-    rsi_data = calculate_rsi(symbol)
+    ma_data = calculate_moving_averages(symbol, interval=interval)
+    rsi_data = calculate_rsi(symbol, interval=interval)
     
     # Extract signals
     ma_signal = ma_data["signal"]
@@ -29,29 +41,29 @@ def trade_recommendation(symbol: str) -> Dict[str, Any]:
     
     # MA contribution
     if "BULLISH" in ma_signal:
-        signal_strength += 1
+        signal_strength += MA_WEIGHT
     elif "BEARISH" in ma_signal:
-        signal_strength -= 1
+        signal_strength -= MA_WEIGHT
         
     # Crossover contribution
     if ma_crossover:
         if "GOLDEN" in ma_crossover_type:
-            signal_strength += 2
+            signal_strength += CROSSOVER_WEIGHT
         elif "DEATH" in ma_crossover_type:
-            signal_strength -= 2
+            signal_strength -= CROSSOVER_WEIGHT
             
     # RSI contribution
     if "OVERSOLD" in rsi_signal:
-        signal_strength += 1.5
+        signal_strength += RSI_WEIGHT
     elif "OVERBOUGHT" in rsi_signal:
-        signal_strength -= 1.5
+        signal_strength -= RSI_WEIGHT
     
     # Determine final recommendation
-    if signal_strength >= 2:
+    if signal_strength >= STRONG_SIGNAL:
         recommendation = "STRONG BUY"
     elif signal_strength > 0:
         recommendation = "BUY"
-    elif signal_strength <= -2:
+    elif signal_strength <= -STRONG_SIGNAL:
         recommendation = "STRONG SELL"
     elif signal_strength < 0:
         recommendation = "SELL"
@@ -65,7 +77,8 @@ def trade_recommendation(symbol: str) -> Dict[str, Any]:
     elif abs(signal_strength) < 1:
         risk_level = "HIGH"  # Weak signal, higher risk
     
-    analysis = f"""# Trading Recommendation for {symbol}
+    with metrics.span("format.trade_reco"):
+        analysis = f"""# Trading Recommendation for {symbol}
 
 ## Summary
 Recommendation: {recommendation}
@@ -97,6 +110,7 @@ This recommendation is based on a combination of Moving Average analysis and RSI
     
     return {
         "symbol": symbol,
+        "interval": interval,
         "recommendation": recommendation,
         "risk_level": risk_level,
         "signal_strength": signal_strength,
@@ -0,0 +1,326 @@
+import itertools
+import math
+import operator
+import os
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.data_model import normalize_symbol
+from utils.indicator_engine import CALCULATORS, indicator_engine
+from utils.market_data import cached_bars
+from utils.metrics import metrics
+
+# Triggered events kept for polling; older ones are dropped
+MAX_EVENTS = int(os.getenv("ALERTS_MAX_EVENTS", "1000"))
+
+COMPARISONS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+CROSSES = ("crosses above", "crosses below", "crosses")
+
+_CONDITION = re.compile(r"^\s*(.+?)\s*(<=|>=|<|>|crosses\s+above|crosses\s+below|crosses)\s*(.+?)\s*$", re.I)
+_INDICATOR = re.compile(r"^(rsi|sma)\s*\(?\s*(\d+)\s*\)?$", re.I)
+
+
+@dataclass(frozen=True)
+class Operand:
+    kind: str  # "rsi", "sma", "close" or "value"
+    period: int = 0
+    value: float = math.nan
+
+    @property
+    def label(self) -> str:
+        if self.kind == "value":
+            return f"{self.value:g}"
+        if self.kind == "close":
+            return "close"
+        return f"{self.kind.upper()}({self.period})"
+
+
+@dataclass(frozen=True)
+class Condition:
+    left: Operand
+    op: str
+    right: Operand
+
+    @property
+    def text(self) -> str:
+        return f"{self.left.label} {self.op} {self.right.label}"
+
+    @property
+    def crossing(self) -> bool:
+        return self.op in CROSSES
+
+
+def _parse_operand(text: str) -> Operand:
+    match = _INDICATOR.match(text)
+    if match:
+        period = int(match.group(2))
+        if period < 1:
+            raise ValueError(f"Period must be at least 1 in '{text}'")
+        return Operand(match.group(1).lower(), period)
+    if text.lower() in ("close", "price"):
+        return Operand("close")
+    try:
+        return Operand("value", value=float(text))
+    except ValueError:
+        raise ValueError(f"Unknown operand '{text}'. Use RSI(n), SMA(n), close or a number.") from None
+
+
+def parse_condition(text: str) -> Condition:
+    """
+    Parse a condition such as "RSI(14) < 30", "close > SMA200" or
+    "SMA20 crosses above SMA50". Operands are RSI(n), SMA(n) (parentheses
+    optional), close/price or a number; operators are <, <=, >, >=,
+    "crosses above", "crosses below" and "crosses" (either way).
+    """
+    match = _CONDITION.match(text)
+    if not match:
+        raise ValueError(f"Can't parse condition '{text}'. Example: 'RSI(14) < 30' or 'SMA20 crosses SMA50'")
+    left, op, right = match.groups()
+    condition = Condition(_parse_operand(left), " ".join(op.lower().split()), _parse_operand(right))
+    if condition.left.kind == "value" and condition.right.kind == "value":
+        raise ValueError(f"Condition '{text}' compares two constants")
+    return condition
+
+
+@dataclass
+class Alert:
+    id: int
+    symbol: str
+    interval: str
+    condition: Condition
+    once: bool = False
+    created: datetime = field(default_factory=datetime.now)
+    # Newest bar evaluated (ns since epoch)
+    last_ts: Optional[int] = None
+    # Comparisons: whether the condition held on the last bar; crossings: sign of left - right
+    state: Optional[int] = None
+    triggers: int = 0
+    last_triggered: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "symbol": self.symbol,
+            "interval": self.interval,
+            "condition": self.condition.text,
+            "once": self.once,
+            "created": self.created.isoformat(timespec="seconds"),
+            "last_bar": str(pd.Timestamp(self.last_ts)) if self.last_ts is not None else None,
+            "active": bool(self.state) if not self.condition.crossing and self.state is not None else None,
+            "triggers": self.triggers,
+            "last_triggered": self.last_triggered,
+        }
+
+
+class AlertEngine:
+    """
+    Threshold and crossover alerts evaluated incrementally per symbol.
+
+    Each alert remembers the last bar it evaluated and its state there, so a
+    check only looks at the bars that arrived since. Indicator values come
+    from the shared streaming states of the indicator engine: all alerts on,
+    say, RSI(14) of one symbol share one O(1)-per-bar update, and the new
+    bars are read off the state's remembered tail. An alert that fell further
+    behind replays just the trailing window it needs.
+
+    Comparisons fire when the condition becomes true (including on the first
+    bar evaluated) and re-arm once it is false again; crossings fire when the
+    sign of left - right flips, with bars where both are equal ignored. Each
+    bar is evaluated once, when it is first seen.
+    """
+
+    def __init__(self, max_events: int = MAX_EVENTS):
+        self._alerts: Dict[int, Alert] = {}
+        self._events: deque = deque(maxlen=max_events)
+        self._ids = itertools.count(1)
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+        # Serializes checks, so a bar is never evaluated twice for one alert
+        self._check_lock = threading.Lock()
+        self.checks = 0
+        self.bars_evaluated = 0
+
+    def add(self, symbol: str, condition: str, interval: str = "1min", once: bool = False) -> Alert:
+        parsed = parse_condition(condition)
+        symbol = normalize_symbol(symbol)
+        with self._lock:
+            for alert in self._alerts.values():
+                if (alert.symbol, alert.interval, alert.condition) == (symbol, interval, parsed):
+                    return alert
+            alert = Alert(next(self._ids), symbol, interval, parsed, once)
+            self._alerts[alert.id] = alert
+        return alert
+
+    def remove(self, alert_id: int) -> Alert:
+        with self._lock:
+            alert = self._alerts.pop(alert_id, None)
+        if alert is None:
+            raise ValueError(f"No alert with id {alert_id}")
+        return alert
+
+    def alerts(self, symbol: Optional[str] = None) -> List[Alert]:
+        with self._lock:
+            alerts = list(self._alerts.values())
+        return [a for a in alerts if symbol is None or a.symbol == normalize_symbol(symbol)]
+
+    def symbols(self) -> List[str]:
+        return sorted({a.symbol for a in self.alerts()})
+
+    def events(self, since: int = 0) -> List[Dict[str, Any]]:
+        """Events with a sequence number after since, oldest first."""
+        with self._lock:
+            return [e for e in self._events if e["seq"] > since]
+
+    def check(
+        self,
+        symbols: Optional[Iterable[str]] = None,
+        load: Callable[[str, str], Optional[pd.DataFrame]] = cached_bars,
+    ) -> List[Dict[str, Any]]:
+        """
+        Evaluate the alerts of symbols (default: all) against the bars load
+        returns (default: whatever is cached, so no API quota is spent) and
+        return the events they triggered.
+        """
+        wanted = None if symbols is None else {normalize_symbol(s) for s in symbols}
+        groups: Dict[Tuple[str, str], List[Alert]] = {}
+        for alert in self.alerts():
+            if wanted is None or alert.symbol in wanted:
+                groups.setdefault((alert.symbol, alert.interval), []).append(alert)
+
+        events = []
+        with self._check_lock, metrics.span("alerts.check"):
+            for (symbol, interval), alerts in groups.items():
+                data = load(symbol, interval)
+                if data is None or data.empty:
+                    continue
+                events += self._check_series(symbol, interval, alerts, data)
+        with self._lock:
+            self.checks += 1
+        if events:
+            metrics.incr("alerts.triggered", len(events))
+        return events
+
+    def _check_series(self, symbol: str, interval: str, alerts: List[Alert],
+                      data: pd.DataFrame) -> List[Dict[str, Any]]:
+        ts = pd.DatetimeIndex(data.index).asi8
+        closes = data["close"]
+        # Bars each alert hasn't seen; a new alert starts at the last bar
+        # (a crossing also needs the one before to know the side it's on)
+        pending = {}
+        for alert in alerts:
+            if alert.last_ts is None:
+                pending[alert.id] = min(len(ts), 2 if alert.condition.crossing else 1)
+            else:
+                pending[alert.id] = len(ts) - int(np.searchsorted(ts, alert.last_ts, side="right"))
+        depth = max(pending.values())
+        if depth == 0:
+            return []
+
+        # Values of every operand over the newest `depth` bars, computed once per group
+        values: Dict[Operand, np.ndarray] = {}
+        for alert in alerts:
+            for operand in (alert.condition.left, alert.condition.right):
+                if operand not in values:
+                    values[operand] = self._operand_values(symbol, interval, operand, closes, depth)
+
+        events = []
+        price = closes.to_numpy(dtype=np.float64)
+        for alert in alerts:
+            k = pending[alert.id]
+            if k == 0:
+                continue
+            left = values[alert.condition.left][-k:]
+            right = values[alert.condition.right][-k:]
+            for i, pos in enumerate(range(len(ts) - k, len(ts))):
+                a, b = float(left[i]), float(right[i])
+                if self._step(alert, a, b):
+                    events.append(self._record(alert, int(ts[pos]), a, b, float(price[pos])))
+                    if alert.once:
+                        break
+            alert.last_ts = int(ts[-1])
+            with self._lock:
+                self.bars_evaluated += k
+                if alert.once and alert.triggers:
+                    self._alerts.pop(alert.id, None)
+        return events
+
+    @staticmethod
+    def _operand_values(symbol: str, interval: str, operand: Operand, closes: pd.Series, k: int) -> np.ndarray:
+        if operand.kind == "value":
+            return np.full(k, operand.value)
+        if operand.kind == "close":
+            return closes.to_numpy(dtype=np.float64)[-k:]
+        state = indicator_engine.update(symbol, interval, operand.kind, operand.period, closes)
+        if k <= len(state.tail):
+            return np.array(state.tail, dtype=np.float64)[-k:]
+        # Further behind than the remembered tail: replay the trailing window into a scratch state
+        calc = CALCULATORS[operand.kind](operand.period)
+        window = closes.to_numpy(dtype=np.float64)[-(k + state.warmup):]
+        return np.array([calc.update(x) for x in window], dtype=np.float64)[-k:]
+
+    @staticmethod
+    def _step(alert: Alert, left: float, right: float) -> bool:
+        """Advance alert's state by one bar; return whether it fired."""
+        if math.isnan(left) or math.isnan(right):
+            return False
+        op = alert.condition.op
+        if op in COMPARISONS:
+            now = int(COMPARISONS[op](left, right))
+            fired = bool(now) and not alert.state
+            alert.state = now
+            return fired
+        side = (left > right) - (left < right)
+        if side == 0:
+            return False
+        previous, alert.state = alert.state, side
+        if previous is None or previous == side:
+            return False
+        return op == "crosses" or (op == "crosses above") == (side > 0)
+
+    def _record(self, alert: Alert, ts: int, left: float, right: float, price: float) -> Dict[str, Any]:
+        condition = alert.condition
+        if condition.crossing:
+            what = f"{condition.left.label} crossed {'above' if left > right else 'below'} {condition.right.label}"
+        else:
+            what = condition.text
+        event = {
+            "alert_id": alert.id,
+            "symbol": alert.symbol,
+            "interval": alert.interval,
+            "condition": condition.text,
+            "bar": str(pd.Timestamp(ts)),
+            "price": price,
+            "values": {condition.left.label: left, condition.right.label: right},
+            "message": f"{alert.symbol} {alert.interval}: {what} at {pd.Timestamp(ts)} (close {price:.2f})",
+            "triggered_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with self._lock:
+            event["seq"] = next(self._seq)
+            self._events.append(event)
+        alert.triggers += 1
+        alert.last_triggered = event["bar"]
+        return event
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "alerts": len(self._alerts),
+                "events": len(self._events),
+                "checks": self.checks,
+                "bars_evaluated": self.bars_evaluated,
+            }
+
+
+alert_engine = AlertEngine()
@@ -22,16 +22,43 @@
 #         return df
 
 # utils/api.py
+import asyncio
 import os
-from typing import Optional
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import httpx
 import requests
 import pandas as pd
 from datetime import datetime
 from dotenv import load_dotenv
 
+from utils.bar_store import bar_store, merge_bars
+from utils.bars import Bars, field_names
+from utils.data_model import INTERVAL_TTL, DEFAULT_TTL, normalize_symbol
+from utils.fetch_lock import fetch_lock
+from utils.market_hours import settled
+from utils.metrics import metrics
+from utils.rate_limit import INTERACTIVE, is_throttle_response, request_scheduler
+
 load_dotenv()
 
 API_KEY = os.getenv("ALPHAVANTAGE_API_KEY") 
+BASE_URL = os.getenv("ALPHAVANTAGE_BASE_URL", "https://www.alphavantage.co/query")
+# Retries after a rate-limit notice, with exponential backoff on top of the scheduler's wait
+MAX_RETRIES = 3
+RETRY_BACKOFF = 1.0
+
+# Map the verbose AV daily columns to normalized names
+DAILY_COLUMNS = {
+    "1. open": "open",
+    "2. high": "high",
+    "3. low": "low",
+    "4. close": "close",
+    "5. adjusted close": "adjusted_close",
+    "6. volume": "volume",
+    "7. dividend amount": "dividend_amount",
+    "8. split coefficient": "split_coefficient",
+}
 
 class AlphaVantageAPI:
     @staticmethod
@@ -40,63 +67,334 @@ class AlphaVantageAPI:
             raise RuntimeError("Alpha Vantage API key not configured. Set ALPHAVANTAGE_API_KEY.")
 
     @staticmethod
-    def get_intraday_data(symbol: str, interval: str = "1min", outputsize: str = "compact") -> pd.DataFrame:
-        AlphaVantageAPI._check_api_key()
-        url = (
-            f"https://www.alphavantage.co/query?function=TIME_SERIES_INTRADAY&symbol={symbol}&interval={interval}&outputsize={outputsize}&apikey={API_KEY}"
-        )
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        data = response.json()
+    def _lookup_store(
+        symbol: str, interval: str, outputsize: str, history: Optional[pd.DataFrame],
+        max_age: Optional[float] = None,
+    ) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
+        """
+        Return (fresh bars, history) from the on-disk bar store. Fresh bars are set
+        when the store holds a series of at least the requested size that is no
+        older than max_age (default: the interval's TTL, or any age while the
+        market has stayed closed since the fetch); otherwise history is the best
+        known full series to extend, if any.
+        """
+        allow_settled = max_age is None
+        if max_age is None:
+            max_age = INTERVAL_TTL.get(interval, DEFAULT_TTL)
+        stored = bar_store.read(symbol, interval)
+        if stored is not None and stored.covers(outputsize):
+            if stored.age <= max_age:
+                df = stored.data
+                df.attrs["fetched_at"] = stored.fetched_at
+                return df, history
+            if allow_settled and settled(stored.fetched_at):
+                df = stored.data
+                df.attrs["fetched_at"] = stored.fetched_at
+                # Final until the next open, so it is as current as a new download
+                df.attrs["as_of"] = datetime.now()
+                return df, history
+            if history is None and stored.outputsize == "full":
+                history = stored.data
+        if history is not None and history.empty:
+            history = None
+        return None, history
 
+    @staticmethod
+    def _after_wait(
+        symbol: str, interval: str, outputsize: str, history: Optional[pd.DataFrame],
+        max_age: Optional[float], waiting_since: float,
+    ) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame]]:
+        """
+        Look the store up again once the fetch lock is held: bars another worker
+        published while we waited count as fresh even for a forced refresh.
+        """
+        if max_age is None:
+            max_age = INTERVAL_TTL.get(interval, DEFAULT_TTL)
+        waited = time.time() - waiting_since
+        fresh, history = AlphaVantageAPI._lookup_store(symbol, interval, outputsize, history, max(max_age, waited))
+        if fresh is not None:
+            metrics.incr("fetch_lock.shared")
+        return fresh, history
+
+    @staticmethod
+    def _save(symbol: str, interval: str, df: pd.DataFrame, outputsize: str) -> pd.DataFrame:
+        fetched_at = datetime.now()
+        bar_store.write(symbol, interval, df, outputsize, fetched_at=fetched_at)
+        # Serve the published memory-mapped copy, so every worker process
+        # shares the same page-cache pages instead of a private heap copy
+        stored = bar_store.read(symbol, interval)
+        if stored is not None and stored.fetched_at == fetched_at:
+            df = stored.data
+        df.attrs["fetched_at"] = fetched_at
+        return df
+
+    @staticmethod
+    def _read_through(
+        symbol: str,
+        interval: str,
+        outputsize: str,
+        fetch: Callable[[str], pd.DataFrame],
+        history: Optional[pd.DataFrame] = None,
+        incremental: bool = True,
+        max_age: Optional[float] = None,
+    ) -> pd.DataFrame:
+        """
+        Serve a request from the bar store when possible. Otherwise, if an older
+        full history is known (passed in or stored), fetch only the compact
+        window and merge it in; fall back to a full download when the delta
+        can't be merged.
+
+        Fetches hold the cross-process fetch lock, so when several workers
+        miss on the same series one downloads it and the rest read its result
+        from the store.
+        """
+        fresh, history = AlphaVantageAPI._lookup_store(symbol, interval, outputsize, history, max_age)
+        if fresh is not None:
+            return fresh
+
+        waiting_since = time.time()
+        with fetch_lock.hold(symbol, interval):
+            fresh, history = AlphaVantageAPI._after_wait(
+                symbol, interval, outputsize, history, max_age, waiting_since
+            )
+            if fresh is not None:
+                return fresh
+
+            df = None
+            if incremental and history is not None:
+                df = merge_bars(history, fetch("compact"))
+            if df is None:
+                df = fetch(outputsize)
+            else:
+                # A merged series is as complete as the history it extends
+                outputsize = "full"
+            return AlphaVantageAPI._save(symbol, interval, df, outputsize)
+
+    @staticmethod
+    def _intraday_params(symbol: str, interval: str, outputsize: str) -> Dict[str, str]:
+        return {
+            "function": "TIME_SERIES_INTRADAY",
+            "symbol": symbol,
+            "interval": interval,
+            "outputsize": outputsize,
+            "apikey": API_KEY,
+        }
+
+    @staticmethod
+    def _daily_params(symbol: str, outputsize: str) -> Dict[str, str]:
+        return {
+            "function": "TIME_SERIES_DAILY_ADJUSTED",
+            "symbol": symbol,
+            "outputsize": outputsize,
+            "apikey": API_KEY,
+        }
+
+    @staticmethod
+    @metrics.timed("parse")
+    def _parse_intraday(data: Dict[str, Any], symbol: str, interval: str) -> pd.DataFrame:
         key = f"Time Series ({interval})"
         if key not in data:
             # surface API error message if present
             raise ValueError(data.get("Note") or data.get("Error Message") or f"No time series data for {symbol}")
 
-        df = pd.DataFrame.from_dict(data[key], orient="index")
-        df.index = pd.to_datetime(df.index)
-        df = df.sort_index()
-        df.columns = [c.split(". ")[1] for c in df.columns]
-        df = df.apply(pd.to_numeric, errors="coerce")
-        # standardize column names to lowercase
-        df.columns = [c.lower().replace(" ", "_") for c in df.columns]
-        return df
+        series = data[key]
+        fields = next(iter(series.values()), {})
+        return Bars.from_time_series(series, field_names(fields)).to_frame()
+
+    @staticmethod
+    @metrics.timed("parse")
+    def _parse_daily(data: Dict[str, Any], symbol: str) -> pd.DataFrame:
+        key = "Time Series (Daily)"
+        if key not in data:
+            raise ValueError(data.get("Note") or data.get("Error Message") or f"No daily data for {symbol}")
+
+        return Bars.from_time_series(data[key], DAILY_COLUMNS).to_frame()
 
     @staticmethod
-    def get_daily_adjusted(symbol: str, outputsize: str = "compact") -> pd.DataFrame:
+    def _get_json(params: Dict[str, str], priority: int = INTERACTIVE) -> Dict[str, Any]:
+        AlphaVantageAPI._check_api_key()
+        for attempt in range(MAX_RETRIES + 1):
+            request_scheduler.acquire(priority)
+            with metrics.span("fetch"):
+                response = requests.get(BASE_URL, params=params, timeout=30)
+            metrics.incr("api_calls")
+            metrics.incr("bytes_downloaded", len(response.content))
+            response.raise_for_status()
+            with metrics.span("json"):
+                data = response.json()
+            if not is_throttle_response(data):
+                break
+            metrics.incr("api_throttled")
+            request_scheduler.throttled()
+            if attempt < MAX_RETRIES:
+                time.sleep(RETRY_BACKOFF * 2 ** attempt)
+        # A final throttle notice falls through to the parser, which raises it
+        return data
+
+    @staticmethod
+    def get_intraday_data(
+        symbol: str,
+        interval: str = "1min",
+        outputsize: str = "compact",
+        history: Optional[pd.DataFrame] = None,
+        incremental: bool = True,
+        priority: int = INTERACTIVE,
+        max_age: Optional[float] = None,
+    ) -> pd.DataFrame:
+        """
+        Fetch TIME_SERIES_INTRADAY, reading through the bar store. When a cached
+        history is available only the compact window is downloaded and merged.
+        max_age overrides how old stored bars may be to skip the download.
+        """
+        symbol = normalize_symbol(symbol)
+
+        def fetch(size: str) -> pd.DataFrame:
+            data = AlphaVantageAPI._get_json(AlphaVantageAPI._intraday_params(symbol, interval, size), priority)
+            return AlphaVantageAPI._parse_intraday(data, symbol, interval)
+
+        return AlphaVantageAPI._read_through(
+            symbol, interval, outputsize, fetch, history=history, incremental=incremental, max_age=max_age
+        )
+
+    @staticmethod
+    def get_daily_adjusted(
+        symbol: str,
+        outputsize: str = "compact",
+        history: Optional[pd.DataFrame] = None,
+        incremental: bool = True,
+        priority: int = INTERACTIVE,
+    ) -> pd.DataFrame:
         """
         Fetch TIME_SERIES_DAILY_ADJUSTED. Returns DataFrame indexed by date (UTC),
         columns: open, high, low, close, adjusted_close, volume, dividend_amount, split_coefficient
         """
+        symbol = normalize_symbol(symbol)
+
+        def fetch(size: str) -> pd.DataFrame:
+            data = AlphaVantageAPI._get_json(AlphaVantageAPI._daily_params(symbol, size), priority)
+            return AlphaVantageAPI._parse_daily(data, symbol)
+
+        return AlphaVantageAPI._read_through(
+            symbol, "1d", outputsize, fetch, history=history, incremental=incremental
+        )
+
+
+class AsyncAlphaVantageAPI:
+    """
+    Async counterpart of AlphaVantageAPI for use on the server's event loop.
+
+    All requests share one httpx.AsyncClient, so connections to Alpha Vantage
+    are kept alive and reused across tool calls. JSON parsing runs in a worker
+    thread to keep the loop responsive on full-size responses.
+    """
+
+    _client: Optional[httpx.AsyncClient] = None
+    _client_loop: Optional[asyncio.AbstractEventLoop] = None
+    limits = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60)
+
+    @classmethod
+    def client(cls) -> httpx.AsyncClient:
+        # A pool is bound to the loop it was created on
+        loop = asyncio.get_running_loop()
+        if cls._client is None or cls._client.is_closed or cls._client_loop is not loop:
+            cls._client = httpx.AsyncClient(timeout=30, limits=cls.limits)
+            cls._client_loop = loop
+        return cls._client
+
+    @classmethod
+    async def aclose(cls) -> None:
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
+    @classmethod
+    async def _get_json(cls, params: Dict[str, str], priority: int = INTERACTIVE) -> Dict[str, Any]:
         AlphaVantageAPI._check_api_key()
-        url = (
-            "https://www.alphavantage.co/query"
-            f"?function=TIME_SERIES_DAILY_ADJUSTED&symbol={symbol}"
-            f"&outputsize={outputsize}&apikey={API_KEY}"
+        for attempt in range(MAX_RETRIES + 1):
+            await request_scheduler.acquire_async(priority)
+            with metrics.span("fetch"):
+                response = await cls.client().get(BASE_URL, params=params)
+            metrics.incr("api_calls")
+            metrics.incr("bytes_downloaded", len(response.content))
+            response.raise_for_status()
+            with metrics.span("json"):
+                data = await asyncio.to_thread(response.json)
+            if not is_throttle_response(data):
+                break
+            metrics.incr("api_throttled")
+            request_scheduler.throttled()
+            if attempt < MAX_RETRIES:
+                await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+        return data
+
+    @classmethod
+    async def _read_through(
+        cls,
+        symbol: str,
+        interval: str,
+        outputsize: str,
+        fetch: Callable[[str], Awaitable[pd.DataFrame]],
+        history: Optional[pd.DataFrame] = None,
+        incremental: bool = True,
+        max_age: Optional[float] = None,
+    ) -> pd.DataFrame:
+        fresh, history = AlphaVantageAPI._lookup_store(symbol, interval, outputsize, history, max_age)
+        if fresh is not None:
+            return fresh
+
+        waiting_since = time.time()
+        async with fetch_lock.ahold(symbol, interval):
+            fresh, history = AlphaVantageAPI._after_wait(
+                symbol, interval, outputsize, history, max_age, waiting_since
+            )
+            if fresh is not None:
+                return fresh
+
+            df = None
+            if incremental and history is not None:
+                df = merge_bars(history, await fetch("compact"))
+            if df is None:
+                df = await fetch(outputsize)
+            else:
+                outputsize = "full"
+            return await asyncio.to_thread(AlphaVantageAPI._save, symbol, interval, df, outputsize)
+
+    @classmethod
+    async def get_intraday_data(
+        cls,
+        symbol: str,
+        interval: str = "1min",
+        outputsize: str = "compact",
+        history: Optional[pd.DataFrame] = None,
+        incremental: bool = True,
+        priority: int = INTERACTIVE,
+        max_age: Optional[float] = None,
+    ) -> pd.DataFrame:
+        symbol = normalize_symbol(symbol)
+
+        async def fetch(size: str) -> pd.DataFrame:
+            data = await cls._get_json(AlphaVantageAPI._intraday_params(symbol, interval, size), priority)
+            return await asyncio.to_thread(AlphaVantageAPI._parse_intraday, data, symbol, interval)
+
+        return await cls._read_through(
+            symbol, interval, outputsize, fetch, history=history, incremental=incremental, max_age=max_age
         )
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        data = response.json()
 
-        key = "Time Series (Daily)"
-        if key not in data:
-            raise ValueError(data.get("Note") or data.get("Error Message") or f"No daily data for {symbol}")
+    @classmethod
+    async def get_daily_adjusted(
+        cls,
+        symbol: str,
+        outputsize: str = "compact",
+        history: Optional[pd.DataFrame] = None,
+        incremental: bool = True,
+        priority: int = INTERACTIVE,
+    ) -> pd.DataFrame:
+        symbol = normalize_symbol(symbol)
 
-        df = pd.DataFrame.from_dict(data[key], orient="index")
-        df.index = pd.to_datetime(df.index)
-        df = df.sort_index()
-        # Map the verbose AV columns to normalized names
-        col_map = {
-            "1. open": "open",
-            "2. high": "high",
-            "3. low": "low",
-            "4. close": "close",
-            "5. adjusted close": "adjusted_close",
-            "6. volume": "volume",
-            "7. dividend amount": "dividend_amount",
-            "8. split coefficient": "split_coefficient",
-        }
-        df = df.rename(columns=col_map)
-        df = df.apply(pd.to_numeric, errors="coerce")
-        return df
\ No newline at end of file
+        async def fetch(size: str) -> pd.DataFrame:
+            data = await cls._get_json(AlphaVantageAPI._daily_params(symbol, size), priority)
+            return await asyncio.to_thread(AlphaVantageAPI._parse_daily, data, symbol)
+
+        return await cls._read_through(
+            symbol, "1d", outputsize, fetch, history=history, incremental=incremental
+        )
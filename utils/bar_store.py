@@ -0,0 +1,188 @@
+import json
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.getenv("FINANCE101_DATA_DIR", os.path.join(os.path.expanduser("~"), ".cache", "finance101"))
+# A compact fetch returns the latest 100 bars, so merging one into a history
+# can revise at most its last REVISION_WINDOW bars
+REVISION_WINDOW = 100
+
+
+@dataclass
+class StoredBars:
+    symbol: str
+    interval: str
+    data: pd.DataFrame
+    fetched_at: datetime
+    outputsize: str
+
+    @property
+    def age(self) -> float:
+        return (datetime.now() - self.fetched_at).total_seconds()
+
+    def covers(self, outputsize: str) -> bool:
+        """A full history satisfies any request; a compact one only compact requests."""
+        return self.outputsize == "full" or outputsize == "compact"
+
+
+class BarStore:
+    """
+    Columnar on-disk store of OHLCV bars, one directory per (symbol, interval).
+
+    Each column is saved as its own .npy file and opened memory-mapped on read,
+    so large histories are paged in lazily instead of being copied. Writes go to
+    a fresh version directory and are published by atomically replacing
+    meta.json, so readers never observe a half-written series.
+
+    Layout:
+        {root}/bars/{SYMBOL}/{interval}/meta.json
+        {root}/bars/{SYMBOL}/{interval}/v{n}/index.npy   (int64 ns since epoch)
+        {root}/bars/{SYMBOL}/{interval}/v{n}/{column}.npy
+    """
+
+    def __init__(self, root: str = DATA_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.root)
+
+    def _series_dir(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, "bars", symbol.upper(), interval)
+
+    def _read_meta(self, series_dir: str) -> Optional[Dict]:
+        try:
+            with open(os.path.join(series_dir, "meta.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def read(self, symbol: str, interval: str) -> Optional[StoredBars]:
+        if not self.enabled:
+            return None
+        series_dir = self._series_dir(symbol, interval)
+        meta = self._read_meta(series_dir)
+        if meta is None:
+            return None
+        version_dir = os.path.join(series_dir, meta["version"])
+        try:
+            index = np.load(os.path.join(version_dir, "index.npy"), mmap_mode="r")
+            columns = {
+                col: np.load(os.path.join(version_dir, f"{col}.npy"), mmap_mode="r")
+                for col in meta["columns"]
+            }
+        except (OSError, ValueError):
+            # Version pruned by a concurrent writer; treat as a miss
+            return None
+        df = pd.DataFrame(columns, index=pd.DatetimeIndex(index.view("datetime64[ns]")), copy=False)
+        return StoredBars(
+            symbol=symbol,
+            interval=interval,
+            data=df,
+            fetched_at=datetime.fromisoformat(meta["fetched_at"]),
+            outputsize=meta["outputsize"],
+        )
+
+    def write(self, symbol: str, interval: str, df: pd.DataFrame, outputsize: str,
+              fetched_at: Optional[datetime] = None) -> None:
+        if not self.enabled or df.empty:
+            return
+        series_dir = self._series_dir(symbol, interval)
+        version = f"v{time.time_ns()}"
+        version_dir = os.path.join(series_dir, version)
+        os.makedirs(version_dir, exist_ok=True)
+
+        index = pd.DatetimeIndex(df.index).tz_localize(None).as_unit("ns")
+        np.save(os.path.join(version_dir, "index.npy"), index.asi8)
+        for col in df.columns:
+            np.save(os.path.join(version_dir, f"{col}.npy"), df[col].to_numpy())
+
+        meta = {
+            "version": version,
+            "columns": [str(c) for c in df.columns],
+            "rows": int(len(df)),
+            "outputsize": outputsize,
+            "fetched_at": (fetched_at or datetime.now()).isoformat(),
+        }
+        tmp_path = os.path.join(series_dir, f"meta.json.{version}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        with self._lock:
+            current = self._read_meta(series_dir)
+            if current is not None and _version_number(current["version"]) > _version_number(version):
+                # A newer write was published while we were saving; drop ours
+                os.remove(tmp_path)
+                shutil.rmtree(version_dir, ignore_errors=True)
+                return
+            os.replace(tmp_path, os.path.join(series_dir, "meta.json"))
+            self._prune(series_dir, keep=version)
+
+    def _prune(self, series_dir: str, keep: str) -> None:
+        # Only older versions are removed: newer ones may still be mid-write.
+        # Readers that already mapped a removed version keep their pages.
+        for name in os.listdir(series_dir):
+            if name.startswith("v") and _version_number(name) < _version_number(keep):
+                shutil.rmtree(os.path.join(series_dir, name), ignore_errors=True)
+
+    def symbols(self, interval: str) -> List[str]:
+        """Symbols with a stored series for interval."""
+        if not self.enabled:
+            return []
+        root = os.path.join(self.root, "bars")
+        try:
+            names = os.listdir(root)
+        except OSError:
+            return []
+        return sorted(n for n in names if os.path.exists(os.path.join(root, n, interval, "meta.json")))
+
+    def delete(self, symbol: str, interval: str) -> None:
+        if self.enabled:
+            shutil.rmtree(self._series_dir(symbol, interval), ignore_errors=True)
+
+
+def merge_bars(history: pd.DataFrame, delta: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Append a compact update to a sorted history without re-sorting it.
+
+    Rows of the history at or after the first delta timestamp are replaced by
+    the delta, which de-duplicates on timestamp and picks up revisions of the
+    last (possibly partial) bar. Returns None when the delta can't be merged
+    safely and a full download is needed instead:
+      - the delta starts after the history ends, so bars may be missing
+      - the delta has columns the history lacks
+      - a new daily bar carries a dividend or split, which restates every
+        earlier adjusted close
+    """
+    if delta.empty:
+        return history
+    if not set(delta.columns) <= set(history.columns):
+        return None
+    history = history[list(delta.columns)]
+    first_new = delta.index[0]
+    if first_new > history.index[-1]:
+        return None
+
+    new_rows = delta.loc[delta.index > history.index[-1]]
+    if "dividend_amount" in new_rows.columns and (new_rows["dividend_amount"].fillna(0) != 0).any():
+        return None
+    if "split_coefficient" in new_rows.columns and (new_rows["split_coefficient"].fillna(1) != 1).any():
+        return None
+
+    cut = history.index.searchsorted(first_new, side="left")
+    return pd.concat([history.iloc[:cut], delta])
+
+
+def _version_number(version: str) -> int:
+    return int(version[1:])
+
+
+bar_store = BarStore()
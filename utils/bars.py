@@ -0,0 +1,88 @@
+import math
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Columns stored as integers; everything else is float64
+INT_COLUMNS = {"volume"}
+
+
+def _coerce_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _parse_column(rows: List[Dict[str, str]], field: str, dtype) -> np.ndarray:
+    values = map(itemgetter(field), rows)
+    try:
+        return np.fromiter(map(int if dtype == np.int64 else float, values), dtype, len(rows))
+    except (KeyError, TypeError, ValueError):
+        # Missing or malformed fields become NaN, like pd.to_numeric(errors="coerce")
+        return np.fromiter((_coerce_float(row.get(field)) for row in rows), np.float64, len(rows))
+
+
+class Bars:
+    """
+    OHLCV bars held as typed, contiguous NumPy arrays: int64 nanosecond
+    timestamps in ascending order and one array per column (float64 prices,
+    int64 volume).
+
+    to_frame() wraps the same arrays in a DataFrame without copying them.
+    """
+
+    __slots__ = ("index", "columns", "_frame")
+
+    def __init__(self, index: np.ndarray, columns: Dict[str, np.ndarray]):
+        self.index = index
+        self.columns = columns
+        self._frame: Optional[pd.DataFrame] = None
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.index.nbytes + sum(c.nbytes for c in self.columns.values()))
+
+    def to_frame(self) -> pd.DataFrame:
+        if self._frame is None:
+            index = pd.DatetimeIndex(self.index.view("datetime64[ns]"))
+            self._frame = pd.DataFrame(self.columns, index=index, copy=False)
+        return self._frame
+
+    @classmethod
+    def from_time_series(cls, series: Dict[str, Dict[str, str]], names: Dict[str, str]) -> "Bars":
+        """
+        Parse an Alpha Vantage "Time Series (...)" object: timestamp strings
+        mapped to {"1. open": "123.45", ...}. names maps the API's field names
+        to column names; fields not in names are dropped.
+        """
+        rows = list(series.values())
+        index = np.array(list(series), dtype="datetime64[ns]").view(np.int64)
+        columns = {
+            name: _parse_column(rows, field, np.int64 if name in INT_COLUMNS else np.float64)
+            for field, name in names.items()
+            if rows and field in rows[0]
+        }
+
+        # The API lists newest first; reversing is enough unless the order is mixed
+        if len(index) > 1 and index[0] > index[-1]:
+            index = index[::-1]
+            columns = {name: values[::-1] for name, values in columns.items()}
+        if len(index) > 1 and (np.diff(index) < 0).any():
+            order = np.argsort(index, kind="stable")
+            index = index[order]
+            columns = {name: values[order] for name, values in columns.items()}
+        return cls(
+            np.ascontiguousarray(index),
+            {name: np.ascontiguousarray(values) for name, values in columns.items()},
+        )
+
+
+def field_names(fields: Iterable[str]) -> Dict[str, str]:
+    """Map Alpha Vantage field names ("5. adjusted close") to column names ("adjusted_close")."""
+    return {field: field.split(". ", 1)[-1].lower().replace(" ", "_") for field in fields}
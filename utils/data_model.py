@@ -1,13 +1,169 @@
-from dataclasses import dataclass
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
 import pandas as pd
-from typing import Dict
+from typing import Dict, Iterator, Optional
+
+# Seconds a cached series stays fresh, by bar interval
+INTERVAL_TTL: Dict[str, float] = {
+    "1min": 60,
+    "5min": 5 * 60,
+    "15min": 15 * 60,
+    "30min": 30 * 60,
+    "60min": 60 * 60,
+    "1d": 24 * 60 * 60,
+}
+DEFAULT_TTL = 60.0
+
+DEFAULT_MAX_BYTES = int(os.getenv("MARKET_DATA_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def normalize_symbol(symbol: str) -> str:
+    """Canonical ticker used in every cache, store and fetch key, so "aapl" and "AAPL" share them."""
+    return symbol.strip().upper()
+
 
 @dataclass
 class MarketData:
+    """
+    Bars for one symbol and interval. The frame is shared by every caller and
+    must be treated as read-only; derived values belong in the indicator store.
+    """
     symbol: str
     interval: str
     data: pd.DataFrame
     last_updated: datetime
+    nbytes: int = field(default=0, compare=False)
+
+    def __post_init__(self):
+        if not self.nbytes:
+            self.nbytes = int(self.data.memory_usage(index=True, deep=True).sum())
+
+    @property
+    def age(self) -> float:
+        return (datetime.now() - self.last_updated).total_seconds()
+
+    def is_stale(self, ttl: Optional[float] = None) -> bool:
+        if ttl is None:
+            ttl = INTERVAL_TTL.get(self.interval, DEFAULT_TTL)
+        return self.age > ttl
+
+
+class MarketDataCache:
+    """
+    Thread-safe LRU cache of MarketData entries keyed by "{symbol}_{interval}".
+
+    Entries expire after the TTL of their interval and the least recently used
+    entries are evicted once the total DataFrame footprint exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ttl: Optional[Dict[str, float]] = None):
+        self.max_bytes = max_bytes
+        self.ttl = dict(INTERVAL_TTL if ttl is None else ttl)
+        self._entries: "OrderedDict[str, MarketData]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def _ttl_for(self, interval: str) -> float:
+        return self.ttl.get(interval, DEFAULT_TTL)
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[MarketData]:
+        """
+        Return the entry for key, or None if it is missing or has expired.
+        Expired entries are kept (and returned when allow_stale is set) so a
+        refresh can build on them.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.is_stale(self._ttl_for(entry.interval)):
+                self.stale += 1
+                if not allow_stale:
+                    return None
+            else:
+                self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+    def peek(self, key: str) -> Optional[MarketData]:
+        """Return the entry for key, fresh or expired, without touching stats or LRU order."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: str, entry: MarketData) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old.nbytes
+            self._entries[key] = entry
+            self.current_bytes += entry.nbytes
+            self._evict()
+
+    def _evict(self) -> None:
+        # Always keep the most recent entry, even if it alone exceeds the budget
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self.current_bytes -= entry.nbytes
+            self.evictions += 1
+
+    def pop(self, key: str, default: Optional[MarketData] = None) -> Optional[MarketData]:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self.current_bytes -= entry.nbytes
+            return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "evictions": self.evictions,
+            }
+
+    # Mapping-style access, so existing `key in cache` / `cache[key]` code keeps working
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)  # type: ignore[arg-type]
+            return entry is not None and not entry.is_stale(self._ttl_for(entry.interval))
+
+    def __getitem__(self, key: str) -> MarketData:
+        with self._lock:
+            entry = self._entries[key]
+            self._entries.move_to_end(key)
+            return entry
+
+    def __setitem__(self, key: str, entry: MarketData) -> None:
+        self.put(key, entry)
+
+    def __delitem__(self, key: str) -> None:
+        if self.pop(key) is None:
+            raise KeyError(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries))
+
 
-market_data_cache: Dict[str, MarketData] = {}
\ No newline at end of file
+market_data_cache = MarketDataCache()
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, every process fetches for itself
+    fcntl = None
+
+from utils.bar_store import bar_store
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Longest a process waits for another one's fetch before fetching itself
+LOCK_TIMEOUT = float(os.getenv("FETCH_LOCK_TIMEOUT", "180"))
+POLL_INTERVAL = 0.05
+
+
+class FetchLock:
+    """
+    Cross-process leader election for API fetches, one lock per (symbol, interval).
+
+    Worker processes sharing a data directory take an advisory flock on
+    {root}/locks/{SYMBOL}_{interval}.lock before downloading. The holder fetches
+    and publishes the bars to the bar store; the others wait, then find the
+    series there and map the same .npy files read-only instead of downloading
+    their own copy. flock is released by the kernel if the holder dies, so a
+    crashed worker can't wedge the rest.
+
+    Waiters poll with a non-blocking flock so the async variant never blocks
+    the event loop. After timeout seconds they give up and fetch anyway.
+    """
+
+    def __init__(self, root: Optional[str] = None, timeout: float = LOCK_TIMEOUT):
+        self.root = bar_store.root if root is None else root
+        self.timeout = timeout
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.root) and fcntl is not None
+
+    def _open(self, symbol: str, interval: str) -> int:
+        lock_dir = os.path.join(self.root, "locks")
+        os.makedirs(lock_dir, exist_ok=True)
+        return os.open(os.path.join(lock_dir, f"{symbol.upper()}_{interval}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+
+    @staticmethod
+    def _try_lock(fd: int) -> bool:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    @staticmethod
+    def _release(fd: int, locked: bool) -> None:
+        if locked:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    def _timed_out(self, symbol: str, interval: str) -> None:
+        metrics.incr("fetch_lock.timeouts")
+        logger.warning("gave up waiting %.0fs for another worker to fetch %s %s", self.timeout, symbol, interval)
+
+    @contextmanager
+    def hold(self, symbol: str, interval: str) -> Iterator[bool]:
+        """Hold the fetch lock for symbol/interval; yields whether it was acquired."""
+        if not self.enabled:
+            yield False
+            return
+        fd = self._open(symbol, interval)
+        locked = self._try_lock(fd)
+        if not locked:
+            metrics.incr("fetch_lock.waits")
+            deadline = time.monotonic() + self.timeout
+            with metrics.span("fetch_lock.wait"):
+                while not locked and time.monotonic() < deadline:
+                    time.sleep(POLL_INTERVAL)
+                    locked = self._try_lock(fd)
+            if not locked:
+                self._timed_out(symbol, interval)
+        try:
+            yield locked
+        finally:
+            self._release(fd, locked)
+
+    @asynccontextmanager
+    async def ahold(self, symbol: str, interval: str) -> AsyncIterator[bool]:
+        if not self.enabled:
+            yield False
+            return
+        fd = self._open(symbol, interval)
+        locked = self._try_lock(fd)
+        if not locked:
+            metrics.incr("fetch_lock.waits")
+            deadline = time.monotonic() + self.timeout
+            with metrics.span("fetch_lock.wait"):
+                while not locked and time.monotonic() < deadline:
+                    await asyncio.sleep(POLL_INTERVAL)
+                    locked = self._try_lock(fd)
+            if not locked:
+                self._timed_out(symbol, interval)
+        try:
+            yield locked
+        finally:
+            self._release(fd, locked)
+
+
+fetch_lock = FetchLock()
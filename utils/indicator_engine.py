@@ -0,0 +1,196 @@
+import atexit
+import json
+import math
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from utils.bar_store import DATA_DIR
+from utils.data_model import normalize_symbol
+from utils.indicators import RollingMean, StreamingRSI
+
+# How many of the most recent indicator values each state remembers
+TAIL = 5
+CHECKPOINT_PATH = os.path.join(DATA_DIR, "indicators.json") if DATA_DIR else ""
+CHECKPOINT_EVERY = 60.0
+MAX_STATES = int(os.getenv("INDICATOR_ENGINE_MAX_STATES", "10000"))
+
+StateKey = Tuple[str, str, str, int]
+Calculator = Union[RollingMean, StreamingRSI]
+
+CALCULATORS = {
+    "sma": RollingMean,
+    "rsi": StreamingRSI,
+}
+
+
+def _same(a: float, b: float) -> bool:
+    return a == b or (math.isnan(a) and math.isnan(b))
+
+
+def _fingerprint(values: np.ndarray, end: int, width: int) -> int:
+    """Checksum of the width - 1 inputs before position end (the last bar is compared on its own)."""
+    return zlib.crc32(values[max(0, end - width + 1):end].tobytes())
+
+
+class IndicatorState:
+    """Incremental state of one indicator on one series, plus its last few outputs."""
+
+    __slots__ = ("calc", "last_ts", "last_input", "tail", "fingerprint")
+
+    def __init__(self, calc: Calculator):
+        self.calc = calc
+        self.last_ts: Optional[int] = None
+        self.last_input = math.nan
+        self.tail: deque = deque(maxlen=TAIL)
+        # Checksum of the inputs before the last one that still affect the value or the tail
+        self.fingerprint: Optional[int] = None
+
+    @property
+    def value(self) -> float:
+        return self.tail[-1] if self.tail else math.nan
+
+    @property
+    def warmup(self) -> int:
+        """Bars needed to rebuild the state from scratch, including the remembered tail."""
+        return self.calc.period + TAIL
+
+    def push(self, ts: int, x: float) -> None:
+        self.tail.append(self.calc.update(x))
+        self.last_ts = ts
+        self.last_input = x
+
+    def revise(self, x: float) -> None:
+        self.tail[-1] = self.calc.revise(x)
+        self.last_input = x
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {
+            "calc": self.calc.state_dict(),
+            "last_ts": self.last_ts,
+            "last_input": self.last_input,
+            "tail": list(self.tail),
+            "fingerprint": self.fingerprint,
+        }
+
+
+class IndicatorEngine:
+    """
+    Keeps streaming indicator state per (symbol, interval, indicator, period).
+
+    On each call only the bars after the last one seen are pushed through the
+    state, so the cost of a call depends on how many bars are new, not on the
+    length of the history. A state that has fallen far behind, or whose last
+    bar is no longer in the series, is rebuilt from just the trailing window
+    it needs. A revised last bar (a partial minute that kept trading) is
+    replaced in place; if an earlier bar inside the state's window changed
+    too (a merged update rewrites the last 100 bars), the state is rebuilt
+    from the trailing window, which a checksum of those inputs detects.
+
+    The least recently used states are dropped beyond max_states.
+    States are checkpointed to CHECKPOINT_PATH next to the bar store and
+    reloaded on start, so a restart resumes with the bars stored on disk.
+    """
+
+    def __init__(self, checkpoint_path: str = CHECKPOINT_PATH, max_states: int = MAX_STATES):
+        self.checkpoint_path = checkpoint_path
+        self.max_states = max_states
+        self._states: "OrderedDict[StateKey, IndicatorState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_checkpoint = time.monotonic()
+        self._dirty = False
+        self.load()
+
+    def update(self, symbol: str, interval: str, indicator: str, period: int, series: pd.Series) -> IndicatorState:
+        """Bring the state for this indicator up to date with series and return it."""
+        key = (normalize_symbol(symbol), interval, indicator, period)
+        values = series.to_numpy(dtype=np.float64)
+        timestamps = pd.DatetimeIndex(series.index).asi8
+        n = len(values)
+
+        with self._lock:
+            state = self._states.get(key)
+            start = None
+            if state is not None and state.last_ts is not None:
+                pos = int(np.searchsorted(timestamps, state.last_ts))
+                if (pos < n and timestamps[pos] == state.last_ts
+                        and state.fingerprint in (None, _fingerprint(values, pos, state.warmup))):
+                    if not _same(values[pos], state.last_input):
+                        state.revise(values[pos])
+                    start = pos + 1
+            if state is None or start is None or n - start > state.warmup:
+                state = IndicatorState(CALCULATORS[indicator](period))
+                start = max(0, n - state.warmup)
+            for i in range(start, n):
+                state.push(int(timestamps[i]), float(values[i]))
+            if n:
+                state.fingerprint = _fingerprint(values, n - 1, state.warmup)
+            self._states[key] = state
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_states:
+                self._states.popitem(last=False)
+            self._dirty = True
+        self._maybe_checkpoint()
+        return state
+
+    def _maybe_checkpoint(self) -> None:
+        if self._dirty and time.monotonic() - self._last_checkpoint >= CHECKPOINT_EVERY:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Write all states to disk (atomically)."""
+        if not self.checkpoint_path:
+            return
+        with self._lock:
+            payload = [
+                {"key": list(key), "indicator": key[2], "state": state.state_dict()}
+                for key, state in self._states.items()
+            ]
+            self._dirty = False
+            self._last_checkpoint = time.monotonic()
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def flush(self) -> None:
+        """Checkpoint if anything changed since the last write."""
+        if self._dirty:
+            self.checkpoint()
+
+    def load(self) -> None:
+        if not self.checkpoint_path:
+            return
+        try:
+            with open(self.checkpoint_path) as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            for item in payload:
+                calc_cls = CALCULATORS.get(item["indicator"])
+                if calc_cls is None:
+                    continue
+                raw = item["state"]
+                state = IndicatorState(calc_cls.from_state(raw["calc"]))
+                state.last_ts = raw["last_ts"]
+                state.last_input = raw["last_input"]
+                state.tail.extend(raw["tail"])
+                state.fingerprint = raw.get("fingerprint")
+                self._states[tuple(item["key"])] = state
+
+    def discard(self, symbol: str, interval: Optional[str] = None) -> None:
+        with self._lock:
+            for key in [k for k in self._states if k[0] == symbol and (interval is None or k[1] == interval)]:
+                del self._states[key]
+
+
+indicator_engine = IndicatorEngine()
+atexit.register(indicator_engine.flush)
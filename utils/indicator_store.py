@@ -0,0 +1,136 @@
+import os
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.bar_store import REVISION_WINDOW
+from utils.data_model import normalize_symbol
+from utils.metrics import metrics
+
+DEFAULT_MAX_BYTES = int(os.getenv("INDICATOR_STORE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# (symbol, interval, indicator, params)
+SeriesKey = Tuple[str, str, str, Hashable]
+
+
+def last_bar_ts(data: pd.DataFrame) -> int:
+    """Timestamp (ns) of the last bar."""
+    if not len(data):
+        return 0
+    if isinstance(data.index, pd.DatetimeIndex):
+        return int(data.index.asi8[-1])
+    return int(pd.Timestamp(data.index[-1]).value)
+
+
+def bar_version(data: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> Tuple:
+    """
+    Identify the state of a bar series: its last timestamp and length, plus a
+    checksum of the last REVISION_WINDOW bars of columns (default: all), so a
+    merged compact update that revises earlier bars counts as new data too.
+    """
+    if not len(data):
+        return (0, 0, 0)
+    crc = 0
+    for col in data.columns if columns is None else columns:
+        crc = zlib.crc32(np.ascontiguousarray(data[col].to_numpy()[-REVISION_WINDOW:]), crc)
+    return (last_bar_ts(data), len(data), crc)
+
+
+def _sizeof(value: Any) -> int:
+    if isinstance(value, (np.ndarray, pd.Series, pd.Index)):
+        return int(value.nbytes)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class IndicatorStore:
+    """
+    LRU memo of computed indicator results, kept apart from the raw bars.
+
+    Results are keyed by (symbol, interval, indicator, params) and tagged with
+    the version (last bar timestamp) of the bars they were computed from. A
+    lookup against the same bars is a hit; once new bars arrive the old result
+    is replaced rather than kept alongside.
+    Entries are evicted least recently used first once their estimated size
+    passes max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[SeriesKey, Tuple[Tuple, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: SeriesKey, version: Tuple) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: SeriesKey, version: Tuple, value: Any) -> None:
+        size = _sizeof(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[2]
+            self._entries[key] = (version, value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted
+                self.evictions += 1
+
+    def get_or_compute(
+        self,
+        symbol: str,
+        interval: str,
+        indicator: str,
+        params: Hashable,
+        data: pd.DataFrame,
+        compute: Callable[[], Any],
+    ) -> Any:
+        """Return the memoized result for the current bars, computing it on a miss."""
+        key = (normalize_symbol(symbol), interval, indicator, params)
+        version = bar_version(data)
+        value = self.get(key, version)
+        if value is None:
+            with metrics.span(f"compute.{indicator}"):
+                value = compute()
+            self.put(key, version, value)
+        return value
+
+    def discard(self, symbol: str, interval: Optional[str] = None) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == symbol and (interval is None or k[1] == interval)]:
+                self.current_bytes -= self._entries.pop(key)[2]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+indicator_store = IndicatorStore()
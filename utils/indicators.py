@@ -1,13 +1,372 @@
+import math
+from collections import deque
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
 import pandas as pd
 
 def sma(data: pd.Series, period: int) -> pd.Series:
-    return data.rolling(window=period).mean()
+    return pd.Series(rolling_mean(data.to_numpy(), period), index=data.index, name=data.name)
 
 def rsi(data: pd.Series, period: int = 14) -> pd.Series:
-    delta = data.diff()
-    gain = delta.where(delta > 0, 0.0)
-    loss = -delta.where(delta < 0, 0.0)
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
-    rs = avg_gain / avg_loss
-    return 100 - (100 / (1 + rs))
\ No newline at end of file
+    return pd.Series(rsi_array(data.to_numpy(), period), index=data.index, name=data.name)
+
+def check_period(period: int, name: str = "period") -> int:
+    """Return period, raising ValueError unless it is a window of at least one bar."""
+    if period < 1:
+        raise ValueError(f"{name} must be at least 1, got {period}")
+    return period
+
+# NumPy kernels. They operate along axis 0, so a 2-D (time x symbol) array
+# computes every column in the same pass.
+
+def rolling_mean(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Rolling mean from a single cumulative sum, NaN until the window is full or
+    while it contains a NaN (the same as Series.rolling(period).mean()).
+    """
+    return rolling_means(values, [period])[period]
+
+
+def rolling_means(values: np.ndarray, periods: Iterable[int]) -> Dict[int, np.ndarray]:
+    """
+    Rolling means for several windows sharing one pair of prefix sums, so each
+    extra window costs a single vectorized difference.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(x)
+    zero = np.zeros((1,) + x.shape[1:])
+    sums = np.concatenate((zero, np.cumsum(np.where(valid, x, 0.0), axis=0)))
+    counts = np.concatenate((zero, np.cumsum(valid, axis=0)))
+    out = {}
+    for period in periods:
+        check_period(period)
+        means = np.full(x.shape, np.nan)
+        if period <= len(x):
+            window_sum = sums[period:] - sums[:-period]
+            window_count = counts[period:] - counts[:-period]
+            means[period - 1:] = np.where(window_count == period, window_sum / period, np.nan)
+        out[period] = means
+    return out
+
+
+def crossovers(short: np.ndarray, long: np.ndarray) -> np.ndarray:
+    """
+    Mark moving average crossovers: +1 where short crosses above long (golden
+    cross), -1 where it crosses below (death cross), 0 elsewhere. Element i
+    compares bar i with bar i-1, so element 0 is always 0.
+    """
+    short = np.asarray(short, dtype=np.float64)
+    long = np.asarray(long, dtype=np.float64)
+    out = np.zeros(short.shape, dtype=np.int8)
+    golden = (short[:-1] <= long[:-1]) & (short[1:] > long[1:])
+    death = (short[:-1] >= long[:-1]) & (short[1:] < long[1:])
+    out[1:][golden] = 1
+    out[1:][death] = -1
+    return out
+
+
+def _diff(x: np.ndarray) -> np.ndarray:
+    out = np.empty_like(x)
+    out[:1] = np.nan
+    out[1:] = x[1:] - x[:-1]
+    return out
+
+
+def _ewm(x: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    # The recursion runs in pandas' compiled ewm kernel, column-wise for 2-D input
+    frame = pd.DataFrame(x.reshape(len(x), -1))
+    out = frame.ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean().to_numpy()
+    return out.reshape(x.shape)
+
+
+def _rs_to_rsi(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def rsi_array(close: np.ndarray, period: int = 14, delta: Optional[np.ndarray] = None) -> np.ndarray:
+    """Simple-average RSI: rolling means of gains and losses (as calculate_rsi reports)."""
+    delta = _diff(np.asarray(close, dtype=np.float64)) if delta is None else delta
+    gain = np.where(np.isnan(delta), np.nan, np.maximum(delta, 0.0))
+    loss = np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0.0))
+    return _rs_to_rsi(rolling_mean(gain, period), rolling_mean(loss, period))
+
+
+def wilder_rsi(close: np.ndarray, period: int = 14, delta: Optional[np.ndarray] = None) -> np.ndarray:
+    """Wilder's RSI: gains and losses smoothed with alpha = 1/period."""
+    check_period(period)
+    delta = _diff(np.asarray(close, dtype=np.float64)) if delta is None else delta
+    gain = np.maximum(delta[1:], 0.0)
+    loss = np.maximum(-delta[1:], 0.0)
+    out = np.full(delta.shape, np.nan)
+    out[1:] = _rs_to_rsi(_ewm(gain, 1 / period, period), _ewm(loss, 1 / period, period))
+    return out
+
+
+def ema(values: np.ndarray, span: int) -> np.ndarray:
+    """Exponential moving average with alpha = 2/(span+1), NaN for the first span-1 bars."""
+    check_period(span, "span")
+    return _ewm(np.asarray(values, dtype=np.float64), 2 / (span + 1), span)
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9,
+         emas: Optional[Dict[int, np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal line and histogram."""
+    check_period(signal, "signal")
+    emas = {} if emas is None else emas
+    for span in (fast, slow):
+        if span not in emas:
+            emas[span] = ema(close, span)
+    line = emas[fast] - emas[slow]
+    signal_line = _ewm(line, 2 / (signal + 1), signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close: np.ndarray, period: int = 20, num_std: float = 2.0,
+              mid: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Middle (SMA), upper and lower Bollinger bands using the population std."""
+    x = np.asarray(close, dtype=np.float64)
+    mid = rolling_mean(x, period) if mid is None else mid
+    # Centre on the first value so the sum of squares doesn't lose precision
+    shifted = x - np.nan_to_num(x[:1])
+    var = rolling_mean(shifted * shifted, period) - rolling_mean(shifted, period) ** 2
+    std = np.sqrt(np.maximum(var, 0.0))
+    return mid, mid + num_std * std, mid - num_std * std
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Average true range with Wilder smoothing."""
+    check_period(period)
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    prev_close = np.empty_like(high)
+    prev_close[:1] = np.nan
+    prev_close[1:] = np.asarray(close, dtype=np.float64)[:-1]
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return _ewm(true_range, 1 / period, period)
+
+
+def vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+         sessions: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Volume-weighted average of the typical price, cumulative within each
+    session (pass a per-bar session id, e.g. the date, to reset daily).
+    """
+    typical = (np.asarray(high, dtype=np.float64) + low + close) / 3
+    volume = np.asarray(volume, dtype=np.float64)
+    pv = np.cumsum(typical * volume, axis=0)
+    vol = np.cumsum(volume, axis=0)
+    if sessions is not None and len(sessions):
+        starts = np.flatnonzero(np.r_[True, sessions[1:] != sessions[:-1]])
+        session_start = np.repeat(starts, np.diff(np.r_[starts, len(sessions)]))
+        # Subtract the running totals as they stood when each bar's session began
+        pv = pv - np.concatenate((np.zeros_like(pv[:1]), pv))[session_start]
+        vol = vol - np.concatenate((np.zeros_like(vol[:1]), vol))[session_start]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return pv / vol
+
+
+def parse_spec(spec: str) -> Tuple[str, Tuple[float, ...]]:
+    """Parse an indicator spec such as "sma:20", "macd:12,26,9" or "vwap" ("sma(20)" works too)."""
+    text = spec.strip().lower()
+    if text.endswith(")") and "(" in text:
+        text = text[:-1].replace("(", ":", 1)
+    name, _, args = text.partition(":")
+    try:
+        params = tuple(float(a) if "." in a else int(a) for a in args.split(",") if a.strip())
+    except ValueError:
+        raise ValueError(f"Indicator spec '{spec}' needs numeric parameters, e.g. \"sma:20\"") from None
+    return name, params
+
+
+INDICATOR_DEFAULTS: Dict[str, Tuple[float, ...]] = {
+    "sma": (20,),
+    "ema": (20,),
+    "rsi": (14,),
+    "wilder_rsi": (14,),
+    "macd": (12, 26, 9),
+    "bollinger": (20, 2.0),
+    "atr": (14,),
+    "vwap": (),
+}
+
+
+def compute_indicators(bars: pd.DataFrame, specs: Iterable[str]) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Compute a bundle of indicators over one set of bars.
+
+    The OHLCV columns are pulled out as arrays once, and intermediates shared
+    between indicators (price deltas, SMAs, EMAs) are computed once, so a
+    bundle costs roughly one pass per distinct kernel rather than one pandas
+    round trip per indicator.
+
+    Returns {spec: {output name: array}}; single-output indicators use the
+    key "value".
+    """
+    close = bars["close"].to_numpy(dtype=np.float64)
+    delta: Optional[np.ndarray] = None
+    means: Dict[int, np.ndarray] = {}
+    emas: Dict[int, np.ndarray] = {}
+    out: Dict[str, Dict[str, np.ndarray]] = {}
+
+    for spec in specs:
+        name, params = parse_spec(spec)
+        if name not in INDICATOR_DEFAULTS:
+            raise ValueError(f"Unknown indicator '{name}'. Available: {', '.join(INDICATOR_DEFAULTS)}")
+        params = params + INDICATOR_DEFAULTS[name][len(params):]
+        # Every parameter is a window length except Bollinger's band width
+        for window in params[:1] if name == "bollinger" else params:
+            if window < 1:
+                raise ValueError(f"Periods in '{spec}' must be at least 1")
+        if name in ("rsi", "wilder_rsi") and delta is None:
+            delta = _diff(close)
+
+        if name == "sma":
+            period = int(params[0])
+            if period not in means:
+                means[period] = rolling_mean(close, period)
+            result = {"value": means[period]}
+        elif name == "ema":
+            span = int(params[0])
+            if span not in emas:
+                emas[span] = ema(close, span)
+            result = {"value": emas[span]}
+        elif name == "rsi":
+            result = {"value": rsi_array(close, int(params[0]), delta=delta)}
+        elif name == "wilder_rsi":
+            result = {"value": wilder_rsi(close, int(params[0]), delta=delta)}
+        elif name == "macd":
+            line, signal_line, hist = macd(close, int(params[0]), int(params[1]), int(params[2]), emas=emas)
+            result = {"macd": line, "signal": signal_line, "histogram": hist}
+        elif name == "bollinger":
+            period = int(params[0])
+            if period not in means:
+                means[period] = rolling_mean(close, period)
+            mid, upper, lower = bollinger(close, period, float(params[1]), mid=means[period])
+            result = {"middle": mid, "upper": upper, "lower": lower}
+        elif name == "atr":
+            result = {"value": atr(bars["high"].to_numpy(), bars["low"].to_numpy(), close, int(params[0]))}
+        else:  # vwap
+            sessions = pd.DatetimeIndex(bars.index).normalize().asi8 if isinstance(bars.index, pd.DatetimeIndex) else None
+            result = {"value": vwap(bars["high"].to_numpy(), bars["low"].to_numpy(), close,
+                                    bars["volume"].to_numpy(), sessions)}
+        out[spec] = result
+    return out
+
+
+# Streaming (one bar at a time) counterparts of the functions above.
+# Each update is O(1); results match the rolling versions bar for bar.
+
+class RollingMean:
+    """Running mean over the last `period` values, NaN until the window is full."""
+
+    __slots__ = ("period", "window", "total", "_since_resum")
+
+    # Re-sum the window now and then so float error can't accumulate
+    RESUM_EVERY = 10_000
+
+    def __init__(self, period: int):
+        self.period = check_period(period)
+        self.window: deque = deque(maxlen=period)
+        self.total = 0.0
+        self._since_resum = 0
+
+    @property
+    def value(self) -> float:
+        if len(self.window) < self.period or math.isnan(self.total):
+            return math.nan
+        return self.total / self.period
+
+    def update(self, x: float) -> float:
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(x)
+        self.total += x
+        self._since_resum += 1
+        if self._since_resum >= self.RESUM_EVERY or math.isnan(self.total):
+            # NaN poisons the running total; recover once it leaves the window
+            self.total = math.fsum(self.window)
+            self._since_resum = 0
+        return self.value
+
+    def revise(self, x: float) -> float:
+        """Replace the most recent value (e.g. a partial bar that was updated)."""
+        self.total += x - self.window[-1]
+        self.window[-1] = x
+        if math.isnan(self.total):
+            self.total = math.fsum(self.window)
+        return self.value
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {"period": self.period, "window": list(self.window)}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "RollingMean":
+        obj = cls(state["period"])
+        obj.window.extend(state["window"])
+        obj.total = math.fsum(obj.window)
+        return obj
+
+
+class StreamingRSI:
+    """Simple-average RSI (running means of gains and losses), as used by calculate_rsi."""
+
+    __slots__ = ("period", "gains", "losses", "prev", "prev_prev")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.gains = RollingMean(period)
+        self.losses = RollingMean(period)
+        self.prev = math.nan
+        self.prev_prev = math.nan
+
+    @property
+    def value(self) -> float:
+        avg_gain, avg_loss = self.gains.value, self.losses.value
+        if math.isnan(avg_gain) or math.isnan(avg_loss):
+            return math.nan
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else math.nan
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def _push_delta(self, delta: float, revise: bool) -> None:
+        gain = max(delta, 0.0) if not math.isnan(delta) else math.nan
+        loss = max(-delta, 0.0) if not math.isnan(delta) else math.nan
+        if revise:
+            self.gains.revise(gain)
+            self.losses.revise(loss)
+        else:
+            self.gains.update(gain)
+            self.losses.update(loss)
+
+    def update(self, close: float) -> float:
+        if not math.isnan(self.prev) or self.gains.window:
+            self._push_delta(close - self.prev, revise=False)
+        self.prev_prev, self.prev = self.prev, close
+        return self.value
+
+    def revise(self, close: float) -> float:
+        """Replace the most recent close."""
+        if self.gains.window:
+            self._push_delta(close - self.prev_prev, revise=True)
+        self.prev = close
+        return self.value
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {
+            "period": self.period,
+            "gains": self.gains.state_dict(),
+            "losses": self.losses.state_dict(),
+            "prev": self.prev,
+            "prev_prev": self.prev_prev,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "StreamingRSI":
+        obj = cls(state["period"])
+        obj.gains = RollingMean.from_state(state["gains"])
+        obj.losses = RollingMean.from_state(state["losses"])
+        obj.prev = state["prev"]
+        obj.prev_prev = state["prev_prev"]
+        return obj
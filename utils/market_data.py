@@ -0,0 +1,212 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+import pandas as pd
+
+from utils.api import AlphaVantageAPI, AsyncAlphaVantageAPI
+from utils.bar_store import bar_store
+from utils.data_model import market_data_cache, MarketData, normalize_symbol
+from utils.rate_limit import BACKGROUND, INTERACTIVE
+from utils.resample import RESAMPLED_INTERVALS, resampler
+from utils.singleflight import SingleFlight
+
+# Concurrent misses for the same "{symbol}_{interval}" share one download
+_flights = SingleFlight()
+
+
+def _fresh(cache_key: str) -> Optional[pd.DataFrame]:
+    entry = market_data_cache.get(cache_key)
+    return entry.data if entry is not None else None
+
+
+def _refilled(cache_key: str) -> Optional[pd.DataFrame]:
+    """Bars stored by a flight that finished just before this one started."""
+    entry = market_data_cache.peek(cache_key)
+    return entry.data if entry is not None and not entry.is_stale() else None
+
+
+def _history(cache_key: str) -> Optional[pd.DataFrame]:
+    """Expired bars to extend incrementally, if any are still cached."""
+    entry = market_data_cache.peek(cache_key)
+    return entry.data if entry is not None else None
+
+
+def _store(cache_key: str, symbol: str, interval: str, df: pd.DataFrame) -> pd.DataFrame:
+    # as_of marks bars known to be current later than their download
+    market_data_cache[cache_key] = MarketData(
+        symbol=symbol,
+        interval=interval,
+        data=df,
+        last_updated=df.attrs.get("as_of", df.attrs.get("fetched_at", datetime.now()))
+    )
+    return df
+
+
+def _restored(cache_key: str, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+    """
+    On a cold start, the full series an earlier process persisted. It is served
+    as-is for one TTL; after that the usual refresh extends it incrementally.
+    """
+    if market_data_cache.peek(cache_key) is not None:
+        return None
+    stored = bar_store.read(symbol, interval)
+    if stored is None or not stored.covers("full"):
+        return None
+    df = stored.data
+    df.attrs["fetched_at"] = stored.fetched_at
+    df.attrs["as_of"] = datetime.now()
+    return _store(cache_key, symbol, interval, df)
+
+
+def get_intraday(symbol: str, interval: str = "1min", priority: int = INTERACTIVE) -> pd.DataFrame:
+    """
+    Return cached intraday bars for a symbol. When the cached entry has expired
+    only the newest bars are fetched and merged into it.
+    """
+    symbol = normalize_symbol(symbol)
+    cache_key = f"{symbol}_{interval}"
+    df = _fresh(cache_key)
+    if df is None:
+        df = _restored(cache_key, symbol, interval)
+    if df is not None:
+        return df
+
+    def load() -> pd.DataFrame:
+        df = _refilled(cache_key)
+        if df is not None:
+            return df
+        df = AlphaVantageAPI.get_intraday_data(
+            symbol, interval, outputsize="full", history=_history(cache_key),
+            priority=priority,
+        )
+        return _store(cache_key, symbol, interval, df)
+
+    return _flights.do(cache_key, load)
+
+
+def get_daily(symbol: str, priority: int = INTERACTIVE) -> pd.DataFrame:
+    """
+    Return cached daily-adjusted bars for a symbol. When the cached entry has
+    expired only the last 100 days are fetched and merged into it.
+    """
+    symbol = normalize_symbol(symbol)
+    cache_key = f"{symbol}_1d"
+    df = _fresh(cache_key)
+    if df is None:
+        df = _restored(cache_key, symbol, "1d")
+    if df is not None:
+        return df
+
+    def load() -> pd.DataFrame:
+        df = _refilled(cache_key)
+        if df is not None:
+            return df
+        df = AlphaVantageAPI.get_daily_adjusted(
+            symbol, outputsize="full", history=_history(cache_key),
+            priority=priority,
+        )
+        return _store(cache_key, symbol, "1d", df)
+
+    return _flights.do(cache_key, load)
+
+
+def get_bars(symbol: str, interval: str = "1min", priority: int = INTERACTIVE) -> pd.DataFrame:
+    """
+    Return intraday bars at any interval. Coarser bars (5/15/30/60min, 1d) are
+    aggregated locally from the cached 1-minute series, so they cost no API
+    quota of their own.
+    """
+    symbol = normalize_symbol(symbol)
+    if interval in RESAMPLED_INTERVALS:
+        return resampler.resample(symbol, interval, get_intraday(symbol, "1min", priority))
+    return get_intraday(symbol, interval, priority)
+
+
+def cached_bars(symbol: str, interval: str = "1min") -> Optional[pd.DataFrame]:
+    """Bars for a symbol from memory or the on-disk store, without any network call."""
+    symbol = normalize_symbol(symbol)
+    if interval in RESAMPLED_INTERVALS:
+        minutes = cached_bars(symbol, "1min")
+        return resampler.resample(symbol, interval, minutes) if minutes is not None else None
+    entry = market_data_cache.peek(f"{symbol}_{interval}")
+    if entry is not None:
+        return entry.data
+    stored = bar_store.read(symbol, interval)
+    return stored.data if stored is not None else None
+
+
+async def aget_intraday(symbol: str, interval: str = "1min", priority: int = INTERACTIVE) -> pd.DataFrame:
+    """Async variant of get_intraday using the pooled HTTP client."""
+    symbol = normalize_symbol(symbol)
+    cache_key = f"{symbol}_{interval}"
+    df = _fresh(cache_key)
+    if df is None:
+        df = _restored(cache_key, symbol, interval)
+    if df is not None:
+        return df
+
+    async def load() -> pd.DataFrame:
+        df = _refilled(cache_key)
+        if df is not None:
+            return df
+        df = await AsyncAlphaVantageAPI.get_intraday_data(
+            symbol, interval, outputsize="full", history=_history(cache_key),
+            priority=priority,
+        )
+        return _store(cache_key, symbol, interval, df)
+
+    return await _flights.do_async(cache_key, load)
+
+
+async def arefresh_intraday(symbol: str, interval: str = "1min", priority: int = BACKGROUND,
+                            max_age: float = 0) -> pd.DataFrame:
+    """
+    Fetch the newest intraday bars even if the cached ones haven't expired yet,
+    and swap them into the cache. Readers keep whatever frame they already
+    hold; callers arriving during the refresh share its result. Bars another
+    worker process published to the store within max_age seconds are used
+    instead of fetching again.
+    """
+    symbol = normalize_symbol(symbol)
+    cache_key = f"{symbol}_{interval}"
+
+    async def load() -> pd.DataFrame:
+        df = await AsyncAlphaVantageAPI.get_intraday_data(
+            symbol, interval, outputsize="full", history=_history(cache_key),
+            priority=priority, max_age=max_age,
+        )
+        return _store(cache_key, symbol, interval, df)
+
+    return await _flights.do_async(cache_key, load)
+
+
+async def aget_daily(symbol: str, priority: int = INTERACTIVE) -> pd.DataFrame:
+    """Async variant of get_daily using the pooled HTTP client."""
+    symbol = normalize_symbol(symbol)
+    cache_key = f"{symbol}_1d"
+    df = _fresh(cache_key)
+    if df is None:
+        df = _restored(cache_key, symbol, "1d")
+    if df is not None:
+        return df
+
+    async def load() -> pd.DataFrame:
+        df = _refilled(cache_key)
+        if df is not None:
+            return df
+        df = await AsyncAlphaVantageAPI.get_daily_adjusted(
+            symbol, outputsize="full", history=_history(cache_key),
+            priority=priority,
+        )
+        return _store(cache_key, symbol, "1d", df)
+
+    return await _flights.do_async(cache_key, load)
+
+
+async def aget_bars(symbol: str, interval: str = "1min", priority: int = INTERACTIVE) -> pd.DataFrame:
+    """Async variant of get_bars; only the 1-minute download is awaited."""
+    symbol = normalize_symbol(symbol)
+    if interval in RESAMPLED_INTERVALS:
+        minutes = await aget_intraday(symbol, "1min", priority)
+        return await asyncio.to_thread(resampler.resample, symbol, interval, minutes)
+    return await aget_intraday(symbol, interval, priority)
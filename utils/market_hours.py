@@ -0,0 +1,48 @@
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+MARKET_TZ = ZoneInfo(os.getenv("MARKET_TIMEZONE", "America/New_York"))
+MARKET_OPEN = (9, 30)
+MARKET_CLOSE = (16, 0)
+
+
+def market_session(now: datetime) -> Optional[datetime]:
+    """Close of the session in progress at now (in MARKET_TZ), or None if the market is closed."""
+    local = now.astimezone(MARKET_TZ)
+    if local.weekday() >= 5:
+        return None
+    open_at = local.replace(hour=MARKET_OPEN[0], minute=MARKET_OPEN[1], second=0, microsecond=0)
+    close_at = local.replace(hour=MARKET_CLOSE[0], minute=MARKET_CLOSE[1], second=0, microsecond=0)
+    return close_at if open_at <= local < close_at else None
+
+
+def next_open(now: datetime) -> datetime:
+    local = now.astimezone(MARKET_TZ)
+    candidate = local.replace(hour=MARKET_OPEN[0], minute=MARKET_OPEN[1], second=0, microsecond=0)
+    if candidate <= local:
+        candidate += timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+def last_close(now: datetime) -> datetime:
+    local = now.astimezone(MARKET_TZ)
+    candidate = local.replace(hour=MARKET_CLOSE[0], minute=MARKET_CLOSE[1], second=0, microsecond=0)
+    if candidate > local:
+        candidate -= timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate -= timedelta(days=1)
+    return candidate
+
+
+def settled(fetched_at: datetime, now: Optional[datetime] = None) -> bool:
+    """
+    Whether bars fetched at fetched_at are final: the market has stayed closed
+    since, so a new download would return the same bars. Naive datetimes are
+    taken as local time.
+    """
+    now = now or datetime.now(MARKET_TZ)
+    return market_session(now) is None and fetched_at.astimezone(MARKET_TZ) >= last_close(now)
@@ -0,0 +1,174 @@
+import asyncio
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds between metrics log lines; 0 disables the periodic log
+LOG_INTERVAL = float(os.getenv("METRICS_LOG_INTERVAL", "0"))
+# Histogram bucket upper bounds in milliseconds
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (milliseconds)."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile (capped at the observed max)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(BUCKETS_MS[i], self.max) if i < len(BUCKETS_MS) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max,
+        }
+
+
+class Metrics:
+    """
+    Process-wide counters and latency histograms.
+
+    Spans time a stage of the hot path (fetch, json, parse, compute.<indicator>,
+    format.<tool>) and tools are timed end to end as tool.<name>. Counters
+    track things like API calls and bytes downloaded; cache hit/miss counts
+    stay with the caches and are merged in by snapshot().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.started = time.time()
+        self._log_thread: Optional[threading.Thread] = None
+
+    def incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, ms: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(ms)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    def timed(self, name: Optional[str] = None) -> Callable:
+        """Decorator timing every call of a sync or async function (errors are counted too)."""
+        def decorate(fn: Callable) -> Callable:
+            label = name or fn.__name__
+
+            if asyncio.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def wrapper(*args, **kwargs):
+                    with self.span(label), self._count_errors(label):
+                        return await fn(*args, **kwargs)
+            else:
+                @functools.wraps(fn)
+                def wrapper(*args, **kwargs):
+                    with self.span(label), self._count_errors(label):
+                        return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    @contextmanager
+    def _count_errors(self, label: str) -> Iterator[None]:
+        try:
+            yield
+        except Exception:
+            self.incr(f"{label}.errors")
+            raise
+
+    def snapshot(self) -> Dict[str, Any]:
+        # Imported here: the caches themselves are instrumented with this module
+        from utils.alerts import alert_engine
+        from utils.data_model import market_data_cache
+        from utils.indicator_store import indicator_store
+        from utils.rate_limit import request_scheduler
+        from utils.resample import resampler
+
+        with self._lock:
+            counters = dict(sorted(self.counters.items()))
+            histograms = {name: h.summary() for name, h in sorted(self.histograms.items())}
+        return {
+            "uptime_s": time.time() - self.started,
+            "counters": counters,
+            "latency": histograms,
+            "market_data_cache": market_data_cache.stats(),
+            "indicator_store": indicator_store.stats(),
+            "request_scheduler": request_scheduler.stats(),
+            "resampler": resampler.stats(),
+            "alerts": alert_engine.stats(),
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.started = time.time()
+
+    def log_line(self) -> str:
+        snap = self.snapshot()
+        cache = snap["market_data_cache"]
+        parts: List[str] = [f"{k}={v}" for k, v in snap["counters"].items()]
+        parts.append(f"cache_hits={cache['hits']} cache_misses={cache['misses']}")
+        parts += [f"{k}.p95={v['p95_ms']:.1f}ms" for k, v in snap["latency"].items()]
+        return "metrics " + " ".join(parts)
+
+    def start_logging(self, interval: float = LOG_INTERVAL) -> Optional[threading.Thread]:
+        """Log a one-line summary every interval seconds from a daemon thread (started once)."""
+        if interval <= 0:
+            return None
+        if self._log_thread is not None:
+            return self._log_thread
+
+        def run():
+            while True:
+                time.sleep(interval)
+                logger.info(self.log_line())
+
+        self._log_thread = threading.Thread(target=run, name="metrics-log", daemon=True)
+        self._log_thread.start()
+        return self._log_thread
+
+
+metrics = Metrics()
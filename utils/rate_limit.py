@@ -0,0 +1,271 @@
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: each process keeps its own quota
+    fcntl = None
+
+from utils.bar_store import DATA_DIR
+
+# Request priorities: lower runs first
+INTERACTIVE = 0
+BACKGROUND = 10
+
+REQUESTS_PER_MINUTE = float(os.getenv("ALPHAVANTAGE_REQUESTS_PER_MINUTE", "5"))
+REQUESTS_PER_DAY = float(os.getenv("ALPHAVANTAGE_REQUESTS_PER_DAY", "25"))
+MAX_WAIT = float(os.getenv("ALPHAVANTAGE_MAX_WAIT", "120"))
+# Token counts shared by every worker process using the same data directory
+QUOTA_PATH = os.path.join(DATA_DIR, "locks", "quota.json") if DATA_DIR else ""
+# Seconds before retrying when another process holds the quota file
+LOCK_RETRY = 0.01
+
+
+class QuotaExceededError(RuntimeError):
+    """Raised when a request can't be scheduled within the remaining API quota."""
+
+
+class TokenBucket:
+    """Classic token bucket: holds up to `capacity` tokens, refilled continuously."""
+
+    def __init__(self, capacity: float, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = capacity
+        # Wall-clock time, so the state means the same thing in every process
+        self.updated = time.time()
+        # Bumped when tokens are spent or drained, i.e. beyond what refilling implies
+        self.changes = 0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available (0 if one is available now)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+        self.changes += 1
+
+    def drain(self, now: float) -> None:
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)
+        self.changes += 1
+
+
+class SharedQuota:
+    """
+    Bucket state kept in a small flock-guarded JSON file, so worker processes
+    sharing a data directory draw from one quota instead of one each. The
+    file also carries the daily count across restarts.
+    """
+
+    def __init__(self, path: str = QUOTA_PATH):
+        self.path = path
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and fcntl is not None
+
+    @contextmanager
+    def sync(self, buckets: Dict[str, TokenBucket], blocking: bool = True) -> Iterator[bool]:
+        """
+        Load the shared state into buckets and run the block under the file
+        lock, writing the state back only if the block spent or drained
+        tokens. Yields True once synced; with blocking off it yields False
+        straight away (buckets untouched) while another process holds the lock.
+        """
+        if not self.enabled:
+            yield True
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                state = json.loads(os.read(fd, 4096) or b"{}")
+            except ValueError:
+                state = {}
+            for name, bucket in buckets.items():
+                if name in state:
+                    bucket.tokens = min(bucket.capacity, state[name]["tokens"])
+                    bucket.updated = state[name]["updated"]
+            changes = {name: bucket.changes for name, bucket in buckets.items()}
+            yield True
+            if any(bucket.changes != changes[name] for name, bucket in buckets.items()):
+                payload = json.dumps({n: {"tokens": b.tokens, "updated": b.updated} for n, b in buckets.items()})
+                os.ftruncate(fd, 0)
+                os.pwrite(fd, payload.encode(), 0)
+        finally:
+            os.close(fd)
+
+
+class _Ticket:
+    __slots__ = ("priority", "seq", "cancelled")
+
+    def __init__(self, priority: int, seq: int):
+        self.priority = priority
+        self.seq = seq
+        self.cancelled = False
+
+    def __lt__(self, other: "_Ticket") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class RequestScheduler:
+    """
+    Central gate for outbound Alpha Vantage calls.
+
+    Every request takes one token from a per-minute and a per-day bucket.
+    Waiting requests are served strictly by priority, then arrival order, so
+    interactive tool calls overtake queued background refreshes. A request
+    that would wait longer than max_wait (typically because the daily quota
+    is spent) fails fast with QuotaExceededError instead of hanging the tool.
+
+    The daily bucket refills continuously rather than at a calendar reset,
+    which errs on the side of staying under the provider's limit.
+
+    The buckets are synced through a SharedQuota file whenever the request
+    at the head of the queue checks for a slot, so the limits hold across
+    worker processes; queue order is per process. The file lock is only
+    tried, never waited on, so a busy lock can't stall the event loop.
+    """
+
+    def __init__(self, per_minute: float = REQUESTS_PER_MINUTE, per_day: float = REQUESTS_PER_DAY,
+                 max_wait: float = MAX_WAIT, shared: Optional[SharedQuota] = None):
+        self.minute = TokenBucket(per_minute, 60)
+        self.day = TokenBucket(per_day, 24 * 60 * 60)
+        self.max_wait = max_wait
+        self.shared = shared if shared is not None else SharedQuota()
+        self._queue: List[_Ticket] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self.granted = 0
+        self.throttle_events = 0
+        self.rejected = 0
+
+    def _enqueue(self, priority: int) -> _Ticket:
+        with self._cond:
+            ticket = _Ticket(priority, next(self._seq))
+            heapq.heappush(self._queue, ticket)
+            return ticket
+
+    def _cancel(self, ticket: _Ticket) -> None:
+        with self._cond:
+            ticket.cancelled = True
+            self._cond.notify_all()
+
+    def _try_acquire(self, ticket: _Ticket) -> float:
+        """Take a token for ticket if it is at the head of the queue; else return seconds to wait."""
+        with self._cond:
+            while self._queue and self._queue[0].cancelled:
+                heapq.heappop(self._queue)
+            if self._queue[0] is not ticket:
+                # Someone ahead of us goes first; re-check once they've been served
+                now = time.time()
+                return max(self.minute.wait_time(now), self.day.wait_time(now), 0.05)
+            with self._synced(blocking=False) as synced:
+                if not synced:
+                    return LOCK_RETRY
+                now = time.time()
+                wait = max(self.minute.wait_time(now), self.day.wait_time(now))
+                if wait > self.max_wait:
+                    heapq.heappop(self._queue)
+                    self.rejected += 1
+                    self._cond.notify_all()
+                    raise QuotaExceededError(
+                        f"Alpha Vantage quota exhausted; next request slot in {wait:.0f}s"
+                    )
+                if wait > 0:
+                    return wait
+                heapq.heappop(self._queue)
+                self.minute.take()
+                self.day.take()
+            self.granted += 1
+            self._cond.notify_all()
+            return 0.0
+
+    def _synced(self, blocking: bool = True):
+        return self.shared.sync({"minute": self.minute, "day": self.day}, blocking)
+
+    def acquire(self, priority: int = INTERACTIVE) -> None:
+        """Block the calling thread until a request slot is granted."""
+        ticket = self._enqueue(priority)
+        try:
+            while True:
+                wait = self._try_acquire(ticket)
+                if wait == 0:
+                    return
+                with self._cond:
+                    self._cond.wait(timeout=min(wait, 1.0))
+        except BaseException:
+            self._cancel(ticket)
+            raise
+
+    async def acquire_async(self, priority: int = INTERACTIVE) -> None:
+        """Await a request slot without blocking the event loop."""
+        ticket = self._enqueue(priority)
+        try:
+            while True:
+                wait = self._try_acquire(ticket)
+                if wait == 0:
+                    return
+                await asyncio.sleep(min(wait, 1.0))
+        except BaseException:
+            self._cancel(ticket)
+            raise
+
+    def throttled(self) -> None:
+        """Record a throttle response: stop issuing requests until the minute bucket refills."""
+        with self._cond, self._synced():
+            self.minute.drain(time.time())
+            self.throttle_events += 1
+
+    def remaining(self) -> Dict[str, float]:
+        # A busy quota file just means reporting this process's last view of it
+        with self._cond, self._synced(blocking=False):
+            now = time.time()
+            self.minute.wait_time(now)
+            self.day.wait_time(now)
+            return {"minute": self.minute.tokens, "day": self.day.tokens}
+
+    def stats(self) -> Dict[str, float]:
+        remaining = self.remaining()
+        with self._cond:
+            return {
+                "granted": self.granted,
+                "queued": sum(1 for t in self._queue if not t.cancelled),
+                "throttle_events": self.throttle_events,
+                "rejected": self.rejected,
+                "remaining_minute": round(remaining["minute"], 2),
+                "remaining_day": round(remaining["day"], 2),
+            }
+
+
+def is_throttle_response(data: Dict) -> Optional[str]:
+    """Return the throttle message if an Alpha Vantage payload is a rate-limit notice."""
+    if "Note" in data:
+        return data["Note"]
+    info = data.get("Information")
+    if info and any(s in info.lower() for s in ("rate limit", "call frequency", "requests per")):
+        return info
+    return None
+
+
+request_scheduler = RequestScheduler()
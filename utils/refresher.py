@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from utils.data_model import INTERVAL_TTL, market_data_cache, normalize_symbol
+from utils.market_data import arefresh_intraday
+from utils.market_hours import MARKET_TZ, market_session, next_open
+from utils.metrics import metrics
+from utils.rate_limit import QuotaExceededError, RequestScheduler, request_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated symbols kept warm while the market is open
+WATCHLIST = [normalize_symbol(s) for s in os.getenv("WATCHLIST", "").split(",") if s.strip()]
+# Shortest pause between refresh cycles, in seconds
+MIN_REFRESH_INTERVAL = float(os.getenv("REFRESH_MIN_INTERVAL", "60"))
+# Fraction of the API quota the refresher may spend; the rest is left for tool calls
+QUOTA_SHARE = float(os.getenv("REFRESH_QUOTA_SHARE", "0.5"))
+# Longest sleep while the market is closed, so watchlist changes are picked up
+IDLE_CHECK = 15 * 60
+
+
+class WatchlistRefresher:
+    """
+    Keeps the 1-minute bars of a watchlist warm during market hours.
+
+    Each cycle refreshes, at background priority, the symbols whose cached bars
+    would expire before the next cycle; the new frames replace the cache
+    entries in one assignment, so tool calls see either the old or the new
+    bars, never a partial update. The pause between cycles is stretched so
+    the refresher spends at most quota_share of the API quota still available
+    for the rest of the session.
+
+    Worker processes sharing a data directory share the quota, and a cycle
+    reuses bars another worker published within the current cadence, so N
+    workers refresh a symbol about as often as one would.
+    """
+
+    def __init__(
+        self,
+        symbols: Optional[List[str]] = None,
+        scheduler: RequestScheduler = request_scheduler,
+        min_interval: float = MIN_REFRESH_INTERVAL,
+        quota_share: float = QUOTA_SHARE,
+        refresh: Callable[..., Awaitable[object]] = arefresh_intraday,
+        on_refresh: Optional[Callable[[str], object]] = None,
+    ):
+        self.symbols: List[str] = list(symbols if symbols is not None else WATCHLIST)
+        self.scheduler = scheduler
+        self.min_interval = min_interval
+        self.quota_share = quota_share
+        self.refresh = refresh
+        # Called in a worker thread after each successful refresh (e.g. to precompute results)
+        self.on_refresh = on_refresh
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self.cycles = 0
+        self.refreshed = 0
+        self.failures: Dict[str, str] = {}
+        self.last_cycle: Optional[datetime] = None
+        self.next_cycle: Optional[datetime] = None
+
+    def set_symbols(self, symbols: List[str]) -> None:
+        self.symbols = list(dict.fromkeys(normalize_symbol(s) for s in symbols if s.strip()))
+        self._wake.set()
+
+    def cadence(self, session_left: float) -> float:
+        """Seconds between cycles that keeps the watchlist within its share of the quota."""
+        if not self.symbols:
+            return IDLE_CHECK
+        cost = len(self.symbols)
+        remaining = self.scheduler.remaining()
+        # Tokens available until the close: what's left now plus what refills meanwhile
+        day_budget = self.quota_share * (remaining["day"] + self.scheduler.day.rate * session_left)
+        minute_budget = self.quota_share * self.scheduler.minute.capacity
+        by_day = cost * session_left / day_budget if day_budget > 0 else session_left
+        by_minute = cost * 60 / minute_budget if minute_budget > 0 else 60
+        return max(self.min_interval, by_day, by_minute)
+
+    def due(self, horizon: float) -> List[str]:
+        """Symbols whose cached bars are missing or will expire within horizon seconds."""
+        ttl = INTERVAL_TTL["1min"]
+        due = []
+        for symbol in self.symbols:
+            entry = market_data_cache.peek(f"{symbol}_1min")
+            if entry is None or entry.age + horizon >= ttl:
+                due.append(symbol)
+        return due
+
+    async def refresh_once(self, symbols: Optional[List[str]] = None, max_age: float = 0) -> Dict[str, str]:
+        """
+        Refresh symbols (default: the whole watchlist) concurrently; return
+        per-symbol errors. Stored bars newer than max_age seconds are reused.
+        """
+        symbols = list(self.symbols if symbols is None else symbols)
+        results = await asyncio.gather(*(self._refresh(s, max_age) for s in symbols), return_exceptions=True)
+        errors = {s: str(r) for s, r in zip(symbols, results) if isinstance(r, Exception)}
+        self.failures = errors
+        self.cycles += 1
+        self.last_cycle = datetime.now(MARKET_TZ)
+        return errors
+
+    async def _refresh(self, symbol: str, max_age: float = 0) -> None:
+        with metrics.span("refresh"):
+            await self.refresh(symbol, max_age=max_age)
+        metrics.incr("refresh.symbols")
+        self.refreshed += 1
+        if self.on_refresh is not None:
+            await asyncio.to_thread(self.on_refresh, symbol)
+
+    async def run(self) -> None:
+        while True:
+            self._wake.clear()
+            now = datetime.now(MARKET_TZ)
+            close_at = market_session(now)
+            if close_at is None or not self.symbols:
+                delay = min(IDLE_CHECK, max(1.0, (next_open(now) - now).total_seconds()))
+            else:
+                delay = self.cadence((close_at - now).total_seconds())
+                symbols = self.due(delay)
+                if symbols:
+                    try:
+                        # Another worker's refresh within this cadence is as good as ours
+                        errors = await self.refresh_once(symbols, max_age=delay)
+                    except QuotaExceededError as exc:
+                        errors = {"*": str(exc)}
+                    if errors:
+                        logger.warning("watchlist refresh failed: %s", errors)
+            self.next_cycle = datetime.now(MARKET_TZ) + timedelta(seconds=delay)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> Optional[asyncio.Task]:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(), name="watchlist-refresher")
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> Dict[str, object]:
+        session = market_session(datetime.now(MARKET_TZ))
+        return {
+            "watchlist": list(self.symbols),
+            "running": self._task is not None and not self._task.done(),
+            "market_open": session is not None,
+            "cadence_s": round(self.cadence((session - datetime.now(MARKET_TZ)).total_seconds()), 1)
+            if session is not None else None,
+            "cycles": self.cycles,
+            "refreshed": self.refreshed,
+            "last_cycle": self.last_cycle.isoformat() if self.last_cycle else None,
+            "next_cycle": self.next_cycle.isoformat() if self.next_cycle else None,
+            "failures": dict(self.failures),
+        }
+
+
+watchlist_refresher = WatchlistRefresher()
@@ -0,0 +1,168 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.bar_store import REVISION_WINDOW
+from utils.indicator_store import bar_version
+from utils.metrics import metrics
+
+# Bar sizes built locally from 1-minute bars, as bucket widths in nanoseconds
+RESAMPLED_INTERVALS = {
+    "5min": 5 * 60 * 10**9,
+    "15min": 15 * 60 * 10**9,
+    "30min": 30 * 60 * 10**9,
+    "60min": 60 * 60 * 10**9,
+    "1d": 24 * 60 * 60 * 10**9,
+}
+MAX_ENTRIES = int(os.getenv("RESAMPLE_MAX_ENTRIES", "512"))
+
+
+def resample_bars(minutes: pd.DataFrame, interval: str) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Aggregate 1-minute bars into interval bars: first open, max high, min low,
+    last close, summed volume and the volume-weighted typical price (vwap).
+    Buckets are aligned to the clock (midnight for "1d") and labelled by their
+    start.
+
+    Returns the bars and, for each, the position of its first minute.
+    """
+    width = RESAMPLED_INTERVALS[interval]
+    ts = pd.DatetimeIndex(minutes.index).asi8
+    if not len(ts):
+        empty = pd.DataFrame(
+            {c: np.empty(0) for c in ("open", "high", "low", "close", "volume", "vwap")},
+            index=pd.DatetimeIndex([], dtype="datetime64[ns]"),
+        )
+        return empty, np.empty(0, dtype=np.int64)
+
+    buckets = ts // width
+    starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+    ends = np.append(starts[1:], len(ts)) - 1
+
+    high = minutes["high"].to_numpy(dtype=np.float64)
+    low = minutes["low"].to_numpy(dtype=np.float64)
+    close = minutes["close"].to_numpy(dtype=np.float64)
+    volume = minutes["volume"].to_numpy(dtype=np.float64) if "volume" in minutes else np.zeros(len(ts))
+
+    bar_volume = np.add.reduceat(volume, starts)
+    turnover = np.add.reduceat((high + low + close) / 3 * volume, starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vwap = np.where(bar_volume > 0, turnover / bar_volume, close[ends])
+
+    bars = pd.DataFrame(
+        {
+            "open": minutes["open"].to_numpy(dtype=np.float64)[starts],
+            "high": np.maximum.reduceat(high, starts),
+            "low": np.minimum.reduceat(low, starts),
+            "close": close[ends],
+            "volume": bar_volume.astype(np.int64) if "volume" in minutes else bar_volume,
+            "vwap": vwap,
+        },
+        index=pd.DatetimeIndex((buckets[starts] * width).view("datetime64[ns]")),
+    )
+    return bars, starts
+
+
+class _Resampled:
+    __slots__ = ("version", "length", "bars", "starts", "source_ts")
+
+    def __init__(self, version: Tuple, length: int, bars: pd.DataFrame, starts: np.ndarray,
+                 source_ts: np.ndarray):
+        self.version = version
+        self.length = length
+        self.bars = bars
+        self.starts = starts
+        # Timestamp of each bar's first minute, to check the source still lines up
+        self.source_ts = source_ts
+
+
+class Resampler:
+    """
+    Cache of coarser bars derived from each symbol's 1-minute series.
+
+    A result is reused until the 1-minute bars change. When new minutes
+    arrive, bars that end before the refreshed window are kept and only the
+    buckets from there on are aggregated again; if the source no longer lines
+    up (a full re-download with a different start) the series is rebuilt.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], _Resampled]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.incremental = 0
+        self.rebuilds = 0
+
+    def resample(self, symbol: str, interval: str, minutes: pd.DataFrame) -> pd.DataFrame:
+        key = (symbol, interval)
+        version = bar_version(minutes)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None and entry.version == version:
+            with self._lock:
+                self.hits += 1
+            return entry.bars
+
+        with metrics.span(f"resample.{interval}"):
+            entry = self._update(entry, interval, minutes, version)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry.bars
+
+    def _update(self, entry: Optional[_Resampled], interval: str, minutes: pd.DataFrame,
+                version: Tuple) -> _Resampled:
+        ts = pd.DatetimeIndex(minutes.index).asi8
+        keep = self._reusable(entry, ts)
+        if keep:
+            cut = int(entry.starts[keep])
+            tail, tail_starts = resample_bars(minutes.iloc[cut:], interval)
+            bars = pd.concat([entry.bars.iloc[:keep], tail])
+            starts = np.concatenate([entry.starts[:keep], tail_starts + cut])
+            with self._lock:
+                self.incremental += 1
+        else:
+            bars, starts = resample_bars(minutes, interval)
+            with self._lock:
+                self.rebuilds += 1
+        return _Resampled(version, len(ts), bars, starts, ts[starts])
+
+    @staticmethod
+    def _reusable(entry: Optional[_Resampled], ts: np.ndarray) -> int:
+        """Number of leading bars of entry that are still valid for the minutes in ts (0 = rebuild)."""
+        if entry is None or not len(entry.starts):
+            return 0
+        # Keep bars that start before the window an incremental refresh may have rewritten
+        keep = int(np.searchsorted(entry.starts, entry.length - REVISION_WINDOW, side="right")) - 1
+        if keep <= 0:
+            return 0
+        cut = int(entry.starts[keep])
+        if cut >= len(ts) or ts[cut] != entry.source_ts[keep] or ts[0] != entry.source_ts[0]:
+            return 0
+        return keep
+
+    def discard(self, symbol: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == symbol]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "incremental": self.incremental,
+                "rebuilds": self.rebuilds,
+            }
+
+
+resampler = Resampler()